@@ -5,9 +5,8 @@ from pathlib import Path
 # Add the project root to Python path
 sys.path.append(str(Path(__file__).parent))
 
-# Import page modules
-from pages import resume_page, esg_dashboard, esg_stock_project, stock_forecasting
 from utils import common_styles
+from utils.page_registry import get_page, labels, start_prefetch
 
 def main():
     # Page configurationa
@@ -26,23 +25,14 @@ def main():
     
     page_selection = st.sidebar.selectbox(
         "Choose a page:",
-        [
-            "🏠 Resume & Portfolio",
-            "📈 ESG Dashboard", 
-            "🎯 ESG-Stock Correlation Analysis",
-            "🔮 Stock Forecasting Models"
-        ]
+        labels()
     )
     
-    # Page routing
-    if page_selection == "🏠 Resume & Portfolio":
-        resume_page.show()
-    elif page_selection == "📈 ESG Dashboard":
-        esg_dashboard.show()
-    elif page_selection == "🎯 ESG-Stock Correlation Analysis":
-        esg_stock_project.show()
-    elif page_selection == "🔮 Stock Forecasting Models":
-        stock_forecasting.show()
+    # Page routing: warm this page's data (and the likely next page's) in the
+    # background, then import and render only the selected page
+    page = get_page(page_selection)
+    start_prefetch(page)
+    page.load()()
     
     # Sidebar additional info
     st.sidebar.markdown("---")
@@ -0,0 +1,89 @@
+"""Cold-start benchmark: import time and memory of the app shell and each page.
+
+Every measurement runs in a fresh interpreter, so nothing is cached between
+pages: the ``app`` row is the navigation shell alone, and each page row is
+the shell plus that page's module (what a visitor opening only that page
+pays). Heavy libraries that ended up imported are listed per row.
+
+Examples:
+    python bench_startup.py
+    python bench_startup.py --repeat 5 --max-seconds 3 --max-rss-mb 400   # fail on regressions
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+HEAVY_MODULES = ['plotly', 'sklearn', 'yfinance', 'statsforecast', 'numba', 'pyarrow', 'scipy']
+
+# Runs in the child interpreter; prints one JSON line
+_PROBE = """
+import importlib, json, resource, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+importlib.import_module('app')
+if {module!r}:
+    importlib.import_module({module!r})
+seconds = time.perf_counter() - started
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+if sys.platform == 'darwin':
+    rss_mb /= 1024  # bytes there, KiB on Linux
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{'seconds': seconds, 'rss_mb': rss_mb, 'modules': len(sys.modules), 'heavy': heavy}}))
+"""
+
+
+def measure(module, repeat=3):
+    """Median import time and peak RSS of ``app`` (+ ``module``) over fresh interpreters"""
+    runs = []
+    for _ in range(repeat):
+        probe = _PROBE.format(root=str(ROOT), module=module, heavy=HEAVY_MODULES)
+        out = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        'seconds': statistics.median(r['seconds'] for r in runs),
+        'rss_mb': statistics.median(r['rss_mb'] for r in runs),
+        'modules': runs[-1]['modules'],
+        'heavy': runs[-1]['heavy'],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start import time and RSS per page")
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh interpreters per row (median is reported)")
+    parser.add_argument('--max-seconds', type=float, help="Fail if any row imports slower than this")
+    parser.add_argument('--max-rss-mb', type=float, help="Fail if any row's peak RSS exceeds this")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(ROOT))
+    from utils.page_registry import PAGES
+
+    rows = {'app': measure('', args.repeat)}
+    for page in PAGES:
+        rows[page.module] = measure(page.module, args.repeat)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'module':<28}{'import (s)':>11}{'RSS (MB)':>10}{'modules':>9}  heavy libraries")
+        for name, row in rows.items():
+            print(f"{name:<28}{row['seconds']:>11.2f}{row['rss_mb']:>10.0f}{row['modules']:>9}  "
+                  f"{', '.join(row['heavy']) or '-'}")
+
+    failed = [
+        name for name, row in rows.items()
+        if (args.max_seconds is not None and row['seconds'] > args.max_seconds)
+        or (args.max_rss_mb is not None and row['rss_mb'] > args.max_rss_mb)
+    ]
+    if failed:
+        print(f"Over budget: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Batch forecasting job.
+
+Fits every requested model on every ticker with a single StatsForecast call
+over a long-format panel (series are fitted in parallel) and writes the
+results to the forecast store read by the Stock Forecasting page.
+
+Examples:
+    python forecast_batch.py T.TO BCE.TO RCI-B.TO
+    python forecast_batch.py T.TO BCE.TO --prices prices.csv   # offline fixture
+    python forecast_batch.py --migrate-csv T.TO.csv             # import a legacy CSV
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Add the project root to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from utils.forecast_store import LEVELS, ForecastStore, from_statsforecast, migrate_csv
+from utils.forecasting import FORECAST_HORIZON, FREQ, HISTORY_YEARS, SEASON_LENGTH, to_training_frame
+from utils.market_data import MarketDataService
+from utils.market_windows import market_now
+from utils.price_store import FrameProvider, PriceStore
+
+
+def build_panel(service, tickers, years):
+    """Long ``unique_id, ds, y`` panel for every ticker with data"""
+    frames, skipped = [], []
+    for ticker in tickers:
+        history = service.get_history(ticker, years)
+        if history.empty:
+            skipped.append(ticker)
+            continue
+        frames.append(to_training_frame(history, ticker))
+    if not frames:
+        return pd.DataFrame(columns=['unique_id', 'ds', 'y']), skipped
+    return pd.concat(frames, ignore_index=True), skipped
+
+
+def run_batch(panel, models, horizon=FORECAST_HORIZON, n_jobs=-1):
+    """One StatsForecast fit/forecast over the whole panel"""
+    from statsforecast import StatsForecast
+    from statsforecast import models as sf_models
+
+    instances = [getattr(sf_models, name)(season_length=SEASON_LENGTH) for name in models]
+    sf = StatsForecast(models=instances, freq=FREQ, n_jobs=n_jobs)
+    return sf.forecast(df=panel, h=horizon, level=LEVELS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forecast a list of tickers into the forecast store")
+    parser.add_argument('tickers', nargs='*', help="Ticker symbols, e.g. T.TO BCE.TO")
+    parser.add_argument('--models', nargs='+', default=['AutoARIMA'],
+                        help="statsforecast model classes (default: AutoARIMA)")
+    parser.add_argument('--horizon', type=int, default=FORECAST_HORIZON, help="Trading days to forecast")
+    parser.add_argument('--years', type=float, default=HISTORY_YEARS, help="Years of history to fit on")
+    parser.add_argument('--prices', type=Path,
+                        help="Offline price fixture (CSV with ticker, Date and OHLCV columns)")
+    parser.add_argument('--price-db', type=Path,
+                        help="SQLite price store to use (default: the app's store, or a temporary one with --prices)")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Parallel workers (-1 = all cores)")
+    parser.add_argument('--out', type=Path, help="Forecast store directory (default: data/forecasts)")
+    parser.add_argument('--migrate-csv', type=Path, metavar='CSV',
+                        help="Import a legacy unique_id/ds/<model> forecast CSV into the store and exit")
+    args = parser.parse_args(argv)
+    forecast_store = ForecastStore(args.out) if args.out is not None else ForecastStore()
+
+    if args.migrate_csv is not None:
+        migrated = migrate_csv(args.migrate_csv, forecast_store)
+        print(f"Migrated {len(migrated):,} rows from {args.migrate_csv} "
+              f"(vintage {migrated['vintage'].iloc[0]:%Y-%m-%d}) to {forecast_store.root}")
+        return 0
+    if not args.tickers:
+        parser.error("give at least one ticker (or --migrate-csv)")
+
+    store_kwargs = {}
+    if args.prices is not None:
+        store_kwargs['provider'] = FrameProvider.from_csv(args.prices)
+        # Keep fixture bars out of the app's real price store
+        store_kwargs['path'] = Path(tempfile.mkdtemp()) / 'prices.sqlite'
+    if args.price_db is not None:
+        store_kwargs['path'] = args.price_db
+    service = MarketDataService(store=PriceStore(**store_kwargs))
+
+    started = time.perf_counter()
+    panel, skipped = build_panel(service, args.tickers, args.years)
+    load_seconds = time.perf_counter() - started
+    if skipped:
+        print(f"No price data for: {', '.join(skipped)}", file=sys.stderr)
+    n_series = panel['unique_id'].nunique()
+    if n_series == 0:
+        print("Nothing to forecast.", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    forecasts = run_batch(panel, args.models, args.horizon, args.n_jobs)
+    fit_seconds = time.perf_counter() - started
+
+    vintage = market_now().tz_localize(None).floor('s')  # Toronto time, like ds
+    forecast_store.write(from_statsforecast(forecasts, args.models, vintage=vintage))
+
+    print(f"Loaded {n_series} series ({len(panel):,} bars) in {load_seconds:.1f}s")
+    print(f"Fitted {len(args.models)} model(s) x {n_series} series in {fit_seconds:.1f}s "
+          f"({n_series / fit_seconds:.2f} series/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
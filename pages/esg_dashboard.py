@@ -1,9 +1,12 @@
-import streamlit as st
-import pandas as pd
+import time
 import numpy as np
-import plotly.graph_objects as go
+import streamlit as st
 import plotly.express as px
-from datetime import date, datetime
+import plotly.graph_objects as go
+from datetime import date
+from utils.carbon_scenarios import DISCOUNT_RATES, build_grid, fan_percentiles
+from utils.emissions_simulator import target_probabilities
+from utils.esg_data import load_esg_dataset
 
 # ----------------------------------------------------------
 # Styles (activates your CSS classes used in markdown blocks)
@@ -19,53 +22,31 @@ hr { border: none; border-top: 1px solid #e5e7eb; margin: 1rem 0; }
 
 # ----------------------------------------------------------
 # Data loaders (keep data separate from UI; easy to audit)
-# Replace page numbers / values with exact citations you used
+# Figures live in data/esg/<version>/ and are validated on load
 # ----------------------------------------------------------
-@st.cache_data
-def load_emissions():
-    # Absolute emissions (tCO2e) — replace with your exact values & cite pages
-    df = pd.DataFrame({
-        'Year': [2019, 2020, 2021, 2022, 2023, 2024],
-        'Scope 1': [62532, 53472, 52252, 52268, 50508, 43243],
-        'Scope 2': [240919, 200848, 204698, 175268, 159134, 143269],
-        # Basis: market-based assumed; edit if location-based for any year
-        'Scope2_Basis': ['market'] * 6,
-        # Finance/volume drivers (placeholders — swap with your  cited figures)
-        'Revenue_CAD_B': [14.7, 15.3, 16.9, 17.3, 20.4, 20.6],   # Annual Report / MD&A p.xx
-        'Connections_M': [15.7, 16.3, 17.2, 18.3, 19.3, 20.4],   # AR/Investor deck p.xx
-    })
-    df['Total'] = df['Scope 1'] + df['Scope 2']
-    # Intensities
-    df['tCO2e_per_BCAD'] = df['Total'] / df['Revenue_CAD_B']
-    df['kgCO2e_per_connection'] = (df['Total'] * 1000) / (df['Connections_M'] * 1e6)
-    return df
-
-@st.cache_data
-def load_targets():
-    return pd.DataFrame({
-        'Goal': [
-            'Net carbon-neutral by 2030',
-            '100% renewable electricity by 2025',
-            'Internet for Good 85K households',
-            'TELUS Health 200K patient visits'
-        ],
-        'Status': ['On-track', 'On-track', 'On-track', 'Achieved'],
-        'Progress': ['38% reduction from 2019', '59% renewable (2024)', '63,500 households', '260,000+ visits']
-    })
-
-@st.cache_data
-def load_programs():
-    return pd.DataFrame({
-        'Program': ['Internet for Good', 'Mobility for Good', 'TELUS Wise', 'Health for Good'],
-        'People Reached': [200000, 61800, 800000, 260000]
-    })
-
-@st.cache_data
-def load_health():
-    return pd.DataFrame({
-        'Metric': ['Lives Covered', 'Virtual Care Members', 'Countries Served'],
-        'Value': [76000000, 6500000, 160]
-    })
+COMPANY = "TELUS"
+PEER_METRICS = {
+    "Total Scope 1+2 (tCO₂e)": "total_tco2e",
+    "tCO₂e / $B Rev": "tCO2e_per_BCAD",
+    "kgCO₂e / connection": "kgCO2e_per_connection",
+}
+
+# Read-only after load, so shared rather than unpickled afresh on every rerun
+@st.cache_resource
+def load_esg():
+    return load_esg_dataset()
+
+def simulate_targets(esg):
+    """Monte Carlo odds of each emission target (cached by input hash in utils.emissions_simulator)"""
+    return target_probabilities(esg.emissions_for(COMPANY)['total_tco2e'], esg.table('emission_targets', COMPANY))
+
+SECTIONS = {
+    "🎯 Key Highlights": lambda year, esg: show_key_highlights(esg),
+    "🌱 Environmental": lambda year, esg: show_environmental(year, esg),
+    "👥 Social": lambda year, esg: show_social(esg),
+    "🏛️ Governance": lambda year, esg: show_governance(),
+    "🏢 Peer Comparison": lambda year, esg: show_peer_comparison(year, esg),
+}
 
 # ----------------------------------------------------------
 # Public entrypoint (kept as show() to match your original)
@@ -86,69 +67,50 @@ def show():
     )
 
     # ---------- Sidebar (filters + quick sources) ----------
-    em = load_emissions()
+    esg = load_esg()
+    years = esg.years(COMPANY)
     with st.sidebar:
         st.header("Filters")
-        year = st.slider("Year", int(em.Year.min()), int(em.Year.max()), int(em.Year.max()))
+        year = st.slider("Year", int(min(years)), int(max(years)), int(max(years)))
         
 
-    # ---------- Tabs ----------
-    esg_tab1, esg_tab2, esg_tab3, esg_tab4 = st.tabs(
-        ["🎯 Key Highlights", "🌱 Environmental", "👥 Social", "🏛️ Governance"]
-    )
-
-    with esg_tab1:
-        show_key_highlights()
+    # ---------- Sections ----------
+    # Only the selected section is built; widgets inside it rerun just that section
+    section = st.radio("Section", list(SECTIONS), horizontal=True, key="esg_section", label_visibility="collapsed")
+    render_section(section, year, esg)
 
-    with esg_tab2:
-        show_environmental(year, em)
+    timings = st.session_state.get("esg_section_ms", {})
+    with st.sidebar.expander("⏱️ Section render times"):
+        for label, ms in timings.items():
+            st.caption(f"{label}: {ms:,.0f} ms")
 
-    with esg_tab3:
-        show_social()
-
-    with esg_tab4:
-        show_governance()
+@st.fragment
+def render_section(section: str, year: int, esg):
+    """Render one section and record how long it took"""
+    started = time.perf_counter()
+    SECTIONS[section](year, esg)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    st.session_state.setdefault("esg_section_ms", {})[section] = elapsed_ms
+    st.caption(f"Section rendered in {elapsed_ms:,.0f} ms")
 
 
 # ----------------------------------------------------------
 # Sections
 # ----------------------------------------------------------
-def show_key_highlights():
-    st.markdown("## 🎯 **TELUS ESG Performance — 2024 Highlights**")
-
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.markdown("""
-        <div class="metric-highlight">
-        <h3>Environmental</h3>
-        <h2>56%</h2>
-        <p>GHG emissions reduction since 2010</p>
-        </div>
-        """, unsafe_allow_html=True)
-    with col2:
-        st.markdown("""
-        <div class="metric-highlight">
-        <h3>Social Impact</h3>
-        <h2>$1.8B</h2>
-        <p>Contributed since 2000</p>
-        </div>
-        """, unsafe_allow_html=True)
-    with col3:
-        st.markdown("""
-        <div class="metric-highlight">
-        <h3>Healthcare</h3>
-        <h2>76M</h2>
-        <p>Lives covered globally</p>
-        </div>
-        """, unsafe_allow_html=True)
-    with col4:
-        st.markdown("""
-        <div class="metric-highlight">
-        <h3>Trees Planted</h3>
-        <h2>8M</h2>
-        <p>Trees planted in 2024</p>
-        </div>
-        """, unsafe_allow_html=True)
+def show_key_highlights(esg):
+    highlight_year = esg.highlight_years(COMPANY)[-1]
+    st.markdown(f"## 🎯 **TELUS ESG Performance — {highlight_year} Highlights**")
+
+    highlights = esg.highlights_for(COMPANY, highlight_year)
+    for col, (category, row) in zip(st.columns(len(highlights)), highlights.iterrows()):
+        with col:
+            st.markdown(f"""
+            <div class="metric-highlight">
+            <h3>{category}</h3>
+            <h2>{row['display']}</h2>
+            <p>{row['description']}</p>
+            </div>
+            """, unsafe_allow_html=True)
 
     st.markdown("## 💰 **Financial Performance (2024)**")
     col1, col2 = st.columns(2)
@@ -168,29 +130,39 @@ def show_key_highlights():
         """, unsafe_allow_html=True)
 
     with col2:
-        targets_df = load_targets()
+        odds, _ = simulate_targets(esg)
+        targets_df = esg.table('targets', COMPANY)
+        targets_df = targets_df.assign(odds=targets_df['goal'].map(odds.set_index('goal')['probability']).map(
+            lambda p: f"{p:.0%}" if p == p else "—"
+        ))
+        targets_df = targets_df.rename(
+            columns={'goal': 'Goal', 'status': 'Status', 'progress': 'Progress', 'odds': 'Simulated odds'}
+        )
         st.markdown("**🎯 ESG Goals Progress**")
         st.dataframe(targets_df, use_container_width=True, hide_index=True)
 
-def show_environmental(year: int, em: pd.DataFrame):
+def show_environmental(year: int, esg):
     st.markdown("## 🌱 **Environmental Performance**")
 
-    # Current + previous for deltas
-    latest = em[em.Year.eq(year)].iloc[0]
-    prev_year = max(int(em.Year.min()), year - 1)
-    prev = em[em.Year.eq(prev_year)].iloc[0]
+    # Current + previous reported year for deltas
+    em = esg.emissions_for(COMPANY)
+    latest = esg.emissions_at(COMPANY, year)
+    prev_year = max([y for y in em.index if y < year], default=year)
+    prev = esg.emissions_at(COMPANY, prev_year)
 
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Total Scope 1+2 (tCO₂e)", f"{latest['Total']:,.0f}", f"{latest['Total']-prev['Total']:+,.0f} vs {prev_year}")
+    c1.metric("Total Scope 1+2 (tCO₂e)", f"{latest['total_tco2e']:,.0f}", f"{latest['total_tco2e']-prev['total_tco2e']:+,.0f} vs {prev_year}")
     c2.metric("tCO₂e / $B Rev", f"{latest['tCO2e_per_BCAD']:,.0f}")
     c3.metric("kgCO₂e / connection", f"{latest['kgCO2e_per_connection']:,.1f}")
-    c4.metric("Scope 2 basis", latest['Scope2_Basis'])
+    c4.metric("Scope 2 basis", latest['scope2_basis'])
 
     col1, col2 = st.columns(2)
 
     with col1:
         # GHG emissions trend
-        emissions_df = em[['Year', 'Scope 1', 'Scope 2', 'Total']]
+        emissions_df = em.reset_index().rename(columns={
+            'year': 'Year', 'scope1_tco2e': 'Scope 1', 'scope2_tco2e': 'Scope 2', 'total_tco2e': 'Total'
+        })[['Year', 'Scope 1', 'Scope 2', 'Total']]
         fig = px.line(
             emissions_df, x='Year', y=['Scope 1', 'Scope 2', 'Total'],
             title='TELUS GHG Emissions (tCO₂e)'
@@ -210,10 +182,12 @@ def show_environmental(year: int, em: pd.DataFrame):
         """, unsafe_allow_html=True)
 
     with col2:
-        # Renewable energy progress (illustrative — ensure you cite your source)
-        renewable_years = [2019, 2021, 2023, 2024, 2025]
-        renewable_percent = [30, 45, 55, 59, 100]  # 2025 = target
-        fig2 = px.bar(x=renewable_years, y=renewable_percent, title='Renewable Electricity (%)')
+        # Renewable energy progress (target years flagged in the dataset)
+        renewables = esg.renewables_for(COMPANY).reset_index()
+        fig2 = px.bar(
+            x=renewables['year'], y=renewables['renewable_pct'], title='Renewable Electricity (%)',
+            color=renewables['is_target'].map({True: 'Target', False: 'Reported'})
+        )
         fig2.add_hline(y=100, line_dash="dash")
         st.plotly_chart(fig2, use_container_width=True)
 
@@ -229,18 +203,94 @@ def show_environmental(year: int, em: pd.DataFrame):
         </div>
         """, unsafe_allow_html=True)
 
+    show_target_pathways(esg)
+
     # Carbon price sensitivity (Finance lens)
     st.markdown("### 💸 Carbon Price Sensitivity")
     price = st.slider("Carbon price ($/tCO₂e)", 0, 300, 75, step=5, key="carbon_price_slider")
-    annual_cost = price * latest['Total']
+    annual_cost = price * latest['total_tco2e']
     st.markdown(f"**Estimated annual carbon cost at ${price}/t:** ${annual_cost:,.0f}")
-
-def show_social():
+    show_carbon_scenarios(year, latest['total_tco2e'])
+
+def show_target_pathways(esg):
+    """Fan of simulated Scope 1+2 pathways against each emission target"""
+    st.markdown("### 🎯 Pathway to Emission Targets")
+    odds, sim = simulate_targets(esg)
+    history = esg.emissions_for(COMPANY)['total_tco2e']
+    bands = sim.percentiles()
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=history.index, y=history.values, name='Reported', line=dict(color='#065f46')))
+    for (lo, hi), opacity in zip([(0, 4), (1, 3)], [0.2, 0.4]):
+        fig.add_trace(go.Scatter(x=sim.years, y=bands[hi], line=dict(width=0), showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(
+            x=sim.years, y=bands[lo], fill='tonexty', line=dict(width=0),
+            fillcolor=f'rgba(5, 150, 105, {opacity})', name='5–95th pct' if lo == 0 else '25–75th pct'
+        ))
+    fig.add_trace(go.Scatter(x=sim.years, y=bands[2], line=dict(color='#059669', dash='dot'), name='Median'))
+    for target in odds.itertuples(index=False):
+        fig.add_trace(go.Scatter(
+            x=[target.target_year], y=[target.threshold_tco2e], mode='markers', marker=dict(symbol='x', size=12),
+            name=f"{target.goal}: {target.probability:.0%} of pathways"
+        ))
+    fig.update_layout(title='Simulated Scope 1+2 pathways (tCO₂e)', yaxis_title='tCO₂e')
+    st.plotly_chart(fig, use_container_width=True)
+
+    model = sim.model
+    st.caption(f"{len(sim.paths):,} pathways. Annual change fitted to {model.observations} reported years: "
+               f"mean {np.expm1(model.mean):+.1%}/yr, std {model.std:.1%}. Each pathway draws its own rate "
+               f"parameters, so the fan includes uncertainty from the short history. "
+               f"Targets are scored on absolute Scope 1+2; offsets are not modelled.")
+
+def show_carbon_scenarios(year: int, base_emissions: float):
+    """NPV of carbon cost over every price path x emissions trajectory x discount rate"""
+    st.markdown("#### Scenario grid: NPV of carbon cost")
+    c1, c2 = st.columns(2)
+    end_year = c1.select_slider("Horizon", options=list(range(max(year + 1, 2030), 2041)), key="carbon_horizon")
+    rate = c2.select_slider("Discount rate", options=list(DISCOUNT_RATES), value=0.06,
+                            format_func=lambda r: f"{r:.0%}", key="carbon_discount_rate")
+
+    started = time.perf_counter()
+    grid = build_grid(base_emissions, year + 1, end_year)
+    npv = grid.evaluate()
+    bands = fan_percentiles(grid)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    d = list(grid.rates).index(rate)
+    fig = px.imshow(
+        npv[:, :, d] / 1e6, x=grid.trajectory_names, y=grid.price_names, aspect='auto',
+        color_continuous_scale='YlOrRd', labels={'x': 'Emissions trajectory', 'y': 'Carbon price path', 'color': '$M'},
+        title=f'NPV of carbon cost {grid.years[0]}–{grid.years[-1]} at {rate:.0%} ($M)'
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    fan = go.Figure()
+    for (lo, hi), opacity in zip([(0, 4), (1, 3)], [0.2, 0.4]):
+        fan.add_trace(go.Scatter(x=grid.years, y=bands[hi] / 1e6, line=dict(width=0), showlegend=False, hoverinfo='skip'))
+        fan.add_trace(go.Scatter(
+            x=grid.years, y=bands[lo] / 1e6, fill='tonexty', line=dict(width=0),
+            fillcolor=f'rgba(220, 38, 38, {opacity})', name='5–95th pct' if lo == 0 else '25–75th pct'
+        ))
+    fan.add_trace(go.Scatter(x=grid.years, y=bands[2] / 1e6, line=dict(color='#b91c1c'), name='Median'))
+    federal = grid.annual_costs()[grid.price_names.index("Federal schedule"), 0]
+    fan.add_trace(go.Scatter(x=grid.years, y=federal / 1e6, line=dict(dash='dash', color='#1e3a8a'),
+                             name='Federal schedule, flat emissions'))
+    fan.update_layout(title='Annual carbon cost across price paths and trajectories ($M)', yaxis_title='$M')
+    st.plotly_chart(fan, use_container_width=True)
+
+    st.caption(f"{grid.size:,} scenarios ({len(grid.price_names)} price paths × {len(grid.trajectory_names)} "
+               f"trajectories × {len(grid.rates)} discount rates) evaluated in {elapsed_ms:.1f} ms. "
+               f"Federal schedule: $80/t in 2024 rising $15/t a year to $170/t in 2030, held after. "
+               f"Assumes every tonne of Scope 1+2 is priced.")
+
+def show_social(esg):
     st.markdown("## 👥 **Social Impact Performance**")
     col1, col2 = st.columns(2)
 
     with col1:
-        programs_df = load_programs()
+        programs_df = esg.table('programs', COMPANY).rename(
+            columns={'program': 'Program', 'people_reached': 'People Reached'}
+        )
         fig = px.bar(
             programs_df, x='Program', y='People Reached',
             title='Social Program Impact', text='People Reached'
@@ -261,7 +311,7 @@ def show_social():
         """, unsafe_allow_html=True)
 
     with col2:
-        health_df = load_health()
+        health_df = esg.table('health', COMPANY).rename(columns={'metric': 'Metric', 'value': 'Value'})
         fig2 = px.bar(health_df, x='Metric', y='Value', title='TELUS Health Global Reach (2024)')
         st.plotly_chart(fig2, use_container_width=True)
 
@@ -325,3 +375,54 @@ def show_governance():
         </ul>
         </div>
         """, unsafe_allow_html=True)
+
+def show_peer_comparison(year: int, esg):
+    st.markdown("## 🏢 **Peer Comparison**")
+
+    companies = esg.companies()
+    if len(companies) < 2:
+        st.info(
+            f"ESG dataset {esg.version} only covers {', '.join(companies)}. Add peers' rows, taken from "
+            f"their own disclosures, to data/esg/{esg.version}/emissions.csv to compare companies."
+        )
+    if year not in esg.cube_years():
+        st.warning(f"No company reports emissions for {year}.")
+        return
+
+    # Every figure below is a lookup into the cube built at ingest
+    section = esg.cross_section(year)
+    c1, c2 = st.columns([1, 2])
+    metric_label = c1.selectbox("Metric", list(PEER_METRICS), key="peer_metric")
+    metric = PEER_METRICS[metric_label]
+    ranked = section.sort_values(f"{metric}_rank")
+    default = list(ranked.index[:10])
+    if COMPANY in section.index and COMPANY not in default:
+        default = [COMPANY] + default[:9]
+    selected = c2.multiselect("Companies", list(ranked.index), default=default, key="peer_companies")
+    if not selected:
+        st.info("Select at least one company to compare.")
+        return
+
+    rows = ranked.loc[[c for c in ranked.index if c in selected]]
+    table = rows[[metric, f"{metric}_yoy", f"{metric}_yoy_pct", f"{metric}_rank", f"{metric}_pctile"]].rename(columns={
+        metric: metric_label,
+        f"{metric}_yoy": "Change vs prior year",
+        f"{metric}_yoy_pct": "Change (%)",
+        f"{metric}_rank": f"Rank of {int(section['peers'].iloc[0])}",
+        f"{metric}_pctile": "Percentile (0 = lowest)",
+    })
+    st.dataframe(table.round(1), use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fig = px.bar(
+            rows.reset_index(), x='company', y=metric, title=f'{metric_label} — {year}',
+            color=rows.index.map(lambda c: COMPANY if c == COMPANY else 'Peers'),
+            labels={'company': 'Company', metric: metric_label, 'color': ''}
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        trend = esg.trend(metric)[list(rows.index)]
+        fig2 = px.line(trend, title=f'{metric_label} over time',
+                       labels={'year': 'Year', 'value': metric_label, 'company': 'Company'})
+        st.plotly_chart(fig2, use_container_width=True)
@@ -2,183 +2,26 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
-import yfinance as yf
-from datetime import datetime, timedelta
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score
+from utils.market_windows import price_cache_stats
+from utils.price_store import upstream_summary
+from utils.event_study import market_model_event_study, panel_event_study
+from utils.chart_utils import DEFAULT_POINT_BUDGET, payload_report, price_trace
+from utils.figure_cache import cached_figure, figure_cache
+from utils.refresh_scheduler import get_scheduler
+from utils.esg_events import (
+    BENCHMARK, DEFAULT_ESTIMATION_DAYS, DEFAULT_EVENT_HALF_WIDTH, ESG_EVENTS, ESTIMATION_GAP, PEER_TICKERS,
+    study_windows,
+)
+from utils.prefetch import register_prefetch_jobs
 import warnings
 warnings.filterwarnings('ignore')
 
-@st.cache_data
-def fetch_stock_data(ticker, start_date, end_date):
-    """Fetch stock data with caching"""
-    try:
-        stock = yf.Ticker(ticker)
-        data = stock.history(start=start_date, end=end_date)
-        return data
-    except Exception as e:
-        st.error(f"Error fetching data for {ticker}: {e}")
-        return None
-
-def calculate_event_impact(stock_data, event_date, window_days=5):
-    """
-    Calculate the actual stock impact around an ESG event using event study methodology
-    
-    Parameters:
-    - stock_data: DataFrame with stock price data
-    - event_date: Date of the ESG event
-    - window_days: Number of days before/after to analyze
-    
-    Returns:
-    - impact_percentage: Calculated abnormal return
-    - details: Dictionary with calculation details
-    """
-    try:
-        event_date = pd.to_datetime(event_date)
-        
-        # Handle timezone compatibility
-        if stock_data.index.tz is not None:
-            if event_date.tz is None:
-                event_date = event_date.tz_localize(stock_data.index.tz)
-        else:
-            if event_date.tz is not None:
-                event_date = event_date.tz_localize(None)
-        
-        # Find the closest trading day to the event
-        try:
-            closest_idx = stock_data.index.get_indexer([event_date], method='nearest')[0]
-            event_trading_date = stock_data.index[closest_idx]
-        except:
-            return 0.0, {"error": "Could not find trading date"}
-        
-        # Define event window (day before to day after the event)
-        event_idx = stock_data.index.get_loc(event_trading_date)
-        
-        # Get prices for the event window
-        if event_idx >= 1 and event_idx < len(stock_data) - 1:
-            price_before = stock_data['Close'].iloc[event_idx - 1]
-            price_after = stock_data['Close'].iloc[event_idx + 1]
-            event_price = stock_data['Close'].iloc[event_idx]
-            
-            # Calculate the 2-day return around the event
-            two_day_return = ((price_after - price_before) / price_before) * 100
-            
-            # Calculate normal volatility (30-day rolling standard deviation)
-            returns = stock_data['Close'].pct_change()
-            normal_volatility = returns.rolling(30).std().iloc[event_idx] * 100
-            
-            # If the return is significantly above normal daily volatility, attribute it to the event
-            # Otherwise, it's likely just normal market noise
-            if abs(two_day_return) > normal_volatility:
-                impact = two_day_return
-            else:
-                impact = two_day_return * 0.5  # Partial attribution
-            
-            details = {
-                "event_date": event_date.strftime('%Y-%m-%d'),
-                "trading_date": event_trading_date.strftime('%Y-%m-%d'),
-                "price_before": price_before,
-                "event_price": event_price,
-                "price_after": price_after,
-                "two_day_return": two_day_return,
-                "normal_volatility": normal_volatility,
-                "attribution": "full" if abs(two_day_return) > normal_volatility else "partial"
-            }
-            
-            return impact, details
-        else:
-            return 0.0, {"error": "Insufficient data around event date"}
-            
-    except Exception as e:
-        return 0.0, {"error": f"Calculation error: {str(e)}"}
-
-@st.cache_data
-def fetch_stock_data(ticker, start_date, end_date):
-    """Fetch stock data with caching"""
-    try:
-        stock = yf.Ticker(ticker)
-        data = stock.history(start=start_date, end=end_date)
-        return data
-    except Exception as e:
-        st.error(f"Error fetching data for {ticker}: {e}")
-        return None
-
-def calculate_event_impact(stock_data, event_date, window_days=5):
-    """
-    Calculate the actual stock impact around an ESG event using event study methodology
-    
-    Parameters:
-    - stock_data: DataFrame with stock price data
-    - event_date: Date of the ESG event
-    - window_days: Number of days before/after to analyze
-    
-    Returns:
-    - impact_percentage: Calculated abnormal return
-    - details: Dictionary with calculation details
-    """
-    try:
-        event_date = pd.to_datetime(event_date)
-        
-        # Handle timezone compatibility
-        if stock_data.index.tz is not None:
-            if event_date.tz is None:
-                event_date = event_date.tz_localize(stock_data.index.tz)
-        else:
-            if event_date.tz is not None:
-                event_date = event_date.tz_localize(None)
-        
-        # Find the closest trading day to the event
-        try:
-            closest_idx = stock_data.index.get_indexer([event_date], method='nearest')[0]
-            event_trading_date = stock_data.index[closest_idx]
-        except:
-            return 0.0, {"error": "Could not find trading date"}
-        
-        # Define event window (day before to day after the event)
-        event_idx = stock_data.index.get_loc(event_trading_date)
-        
-        # Get prices for the event window
-        if event_idx >= 1 and event_idx < len(stock_data) - 1:
-            price_before = stock_data['Close'].iloc[event_idx - 1]
-            price_after = stock_data['Close'].iloc[event_idx + 1]
-            event_price = stock_data['Close'].iloc[event_idx]
-            
-            # Calculate the 2-day return around the event
-            two_day_return = ((price_after - price_before) / price_before) * 100
-            
-            # Calculate normal volatility (30-day rolling standard deviation)
-            returns = stock_data['Close'].pct_change()
-            normal_volatility = returns.rolling(30).std().iloc[event_idx] * 100
-            
-            # If the return is significantly above normal daily volatility, attribute it to the event
-            # Otherwise, it's likely just normal market noise
-            if abs(two_day_return) > normal_volatility:
-                impact = two_day_return
-            else:
-                impact = two_day_return * 0.5  # Partial attribution
-            
-            details = {
-                "event_date": event_date.strftime('%Y-%m-%d'),
-                "trading_date": event_trading_date.strftime('%Y-%m-%d'),
-                "price_before": price_before,
-                "event_price": event_price,
-                "price_after": price_after,
-                "two_day_return": two_day_return,
-                "normal_volatility": normal_volatility,
-                "attribution": "full" if abs(two_day_return) > normal_volatility else "partial"
-            }
-            
-            return impact, details
-        else:
-            return 0.0, {"error": "Insufficient data around event date"}
-            
-    except Exception as e:
-        return 0.0, {"error": f"Calculation error: {str(e)}"}
-
 def show():
     """Display the ESG-Stock Correlation Analysis project"""
     
+    # Normally done by the router; makes the page work on its own too
+    register_prefetch_jobs(["esg_event_study"])
+    
     st.markdown('<h1 class="main-header">📈 Telus ESG Impact on Stock Performance</h1>', unsafe_allow_html=True)
     
      
@@ -193,17 +36,19 @@ def show_stock_analysis():
     
     st.markdown("## 📈 **Telus Stock Performance & ESG Events Analysis**")
     
-    # Fetch real Telus data
+    # Real Telus data is fetched by the background refresh job
+    scheduler = get_scheduler()
     try:
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=2*365)  # 2 years of data
-        
         with st.spinner("Fetching real Telus stock data..."):
-            telus_data = fetch_stock_data("T.TO", start_date, end_date)
+            snapshot = scheduler.wait_for("esg_event_study")
         
-        if telus_data is None or telus_data.empty:
-            st.error("Unable to fetch Telus stock data. Please check your internet connection.")
+        if snapshot is None or snapshot.value['telus'].empty:
+            error = scheduler.last_error.get("esg_event_study")
+            st.error(f"Unable to fetch Telus stock data: {error}" if error else
+                     "Unable to fetch Telus stock data. Please check your internet connection.")
             return
+        telus_data = snapshot.value['telus']
+        st.caption(snapshot.describe())
         
         # Get current metrics
         current_price = telus_data['Close'].iloc[-1]
@@ -239,111 +84,56 @@ def show_stock_analysis():
         st.error(f"Error processing stock data: {e}")
         return
     
-    # ESG Events Data - Using verified annual ESG reporting dates (beginning of month)
-    esg_events_raw = [
-        {'name': '2024 ESG Data Sheet Release', 'date': '2025-05-01', 'color': 'green'},
-        {'name': 'S&P Global ESG Score Update', 'date': '2025-09-01', 'color': 'blue'},
-        {'name': '2023 ESG Data Sheet Release', 'date': '2024-05-01', 'color': 'green'},
-        {'name': 'S&P Global ESG Score Update', 'date': '2024-09-01', 'color': 'blue'},
-        {'name': '2022 ESG Data Sheet Release', 'date': '2023-05-01', 'color': 'green'}
-    ]
-    
-    esg_events = []
-    calculation_details = []
-    
-    for event in esg_events_raw:
-        impact, details = calculate_event_impact(telus_data, event['date'])
-        
-        event_with_impact = event.copy()
-        event_with_impact['impact'] = f"{impact:+.2f}%"
-        event_with_impact['impact_value'] = impact
-        esg_events.append(event_with_impact)
-        calculation_details.append(details)
+    esg_events_raw = ESG_EVENTS
+    event_dates = [e['date'] for e in esg_events_raw]
     
+    with st.expander("⚙️ Event-Study Settings"):
+        estimation_days = st.slider("Estimation window (trading days)", 60, 250, DEFAULT_ESTIMATION_DAYS, step=10)
+        event_half_width = st.slider("Event window (± trading days)", 0, 5, DEFAULT_EVENT_HALF_WIDTH)
+    estimation_window, event_window = study_windows(estimation_days, event_half_width)
     
-    fig = go.Figure()
-    
-    # Add real stock price line
-    fig.add_trace(go.Scatter(
-        x=telus_data.index,
-        y=telus_data['Close'],
-        mode='lines',
-        name='Telus Stock Price',
-        line=dict(color='#4B0F62', width=3),
-        hovertemplate='Date: %{x}<br>Price: $%{y:.2f} CAD<extra></extra>'
-    ))
+    # Every event was scored in one vectorised pass by the refresh job
+    impacts = snapshot.value['impacts']
     
-    for i, event in enumerate(esg_events):
-        event_date = pd.to_datetime(event['date'])
-        
-        # Make event_date timezone-aware to match telus_data.index
-        if telus_data.index.tz is not None:
-            if event_date.tz is None:
-                event_date = event_date.tz_localize(telus_data.index.tz)
-        
-        # Convert data index to timezone-naive for comparison if needed
-        data_start = telus_data.index[0]
-        data_end = telus_data.index[-1]
-        
-        if data_start.tz is not None:
-            data_start_naive = data_start.tz_localize(None)
-            data_end_naive = data_end.tz_localize(None)
-            event_date_naive = event_date.tz_localize(None) if event_date.tz is not None else event_date
+    # Market-model abnormal returns against the TSX Composite
+    benchmark_data = snapshot.value['benchmark']
+    study = None
+    if not benchmark_data.empty:
+        if (estimation_days, event_half_width) == (DEFAULT_ESTIMATION_DAYS, DEFAULT_EVENT_HALF_WIDTH):
+            study = snapshot.value['study']
         else:
-            data_start_naive = data_start
-            data_end_naive = data_end
-            event_date_naive = event_date.tz_localize(None) if event_date.tz is not None else event_date
-        
-        # Check if event date is within our data range
-        if event_date_naive >= data_start_naive and event_date_naive <= data_end_naive:
-            # Find the closest trading day to the event
-            try:
-                closest_idx = telus_data.index.get_indexer([event_date], method='nearest')[0]
-                closest_date = telus_data.index[closest_idx]
-                event_price = telus_data.loc[closest_date, 'Close']
-                
-                # Add event marker
-                fig.add_trace(go.Scatter(
-                    x=[closest_date],
-                    y=[event_price + 0.5],  # Slightly above the price line
-                    mode='markers+text',
-                    marker=dict(
-                        size=25,
-                        color=event['color'],
-                        symbol='star',
-                        line=dict(width=2, color='black')
-                    ),
-                    text=event['impact'],
-                    textposition="top center",
-                    textfont=dict(size=12, color='black'),
-                    name=f"{event['name']} ({event['date']})",
-                    showlegend=True,
-                    hovertemplate=f"<b>{event['name']}</b><br>Date: {event['date']}<br>Calculated Impact: {event['impact']}<br>Price: $%{{y:.2f}} CAD<extra></extra>"
-                ))
-                
-                # Add vertical line
-                fig.add_vline(
-                    x=closest_date,
-                    line_dash="dash",
-                    line_color=event['color'],
-                    line_width=2,
-                    opacity=0.7
-                )
-            except Exception as e:
-                st.write(f"⚠️ Error processing {event['name']}: {e}")
+            study = market_model_event_study(
+                telus_data['Close'], benchmark_data['Close'], event_dates,
+                estimation_window=estimation_window, event_window=event_window,
+            )
+    else:
+        st.warning(f"Benchmark {BENCHMARK} unavailable — showing raw 2-day returns instead of market-model CARs.")
+    
+    esg_events = []
+    for i, (event, row) in enumerate(zip(esg_events_raw, impacts.itertuples(index=False))):
+        event_with_impact = event.copy()
+        if study is not None:
+            car = study['car'].iloc[i]
+            event_with_impact['impact'] = f"{car:+.2f}%" if study['valid'].iloc[i] else "n/a"
+            event_with_impact['impact_value'] = car
         else:
-            continue
+            event_with_impact['impact'] = f"{row.impact:+.2f}%"
+            event_with_impact['impact_value'] = row.impact
+        esg_events.append(event_with_impact)
     
-    # Update chart layout
-    fig.update_layout(
-        title="Telus Stock Price with Calculated ESG Event Impacts",
-        xaxis_title="Date",
-        yaxis_title="Price (CAD)",
-        height=600,
-        showlegend=True,
-        hovermode='x unified'
+    
+    # Reruns that don't change the chart inputs reuse the already-built figure
+    fig = cached_figure(
+        "esg_price_chart",
+        (telus_data['Close'], impacts, esg_events),
+        lambda: build_price_chart(telus_data, esg_events, impacts),
     )
     
+    if st.sidebar.checkbox("Show chart payload stats"):
+        st.sidebar.caption(payload_report(
+            lambda max_points: build_price_chart(telus_data, esg_events, impacts, max_points)
+        ))
+    
     # Display the chart
     st.plotly_chart(fig, use_container_width=True)
     
@@ -357,6 +147,18 @@ def show_stock_analysis():
         'Event Type': ['ESG Reporting', 'ESG Score Update', 'ESG Reporting', 'ESG Score Update', 'ESG Reporting']
     })
     
+    if study is not None:
+        impact_df['BHAR'] = study['bhar'].map(lambda v: f"{v:+.2f}%" if pd.notna(v) else "n/a").values
+        impact_df['t-stat'] = study['car_t'].round(2).values
+        impact_df['Beta'] = study['beta'].round(2).values
+        impact_df['Significant (5%)'] = np.where(study['significant'], 'Yes', 'No')
+        impact_df = impact_df.rename(columns={'Stock Impact': 'CAR'})
+        st.caption(
+            f"Market model vs {BENCHMARK}: OLS over {estimation_days} trading days ending "
+            f"{ESTIMATION_GAP + 1} days before each event; CAR/BHAR over ±{event_half_width} days. "
+            "n/a = not enough history before the event."
+        )
+    
     st.dataframe(impact_df, use_container_width=True, hide_index=True)
     
     # Calculate real performance metrics
@@ -377,3 +179,145 @@ def show_stock_analysis():
             daily_returns = telus_data['Close'].pct_change().dropna()
             volatility = daily_returns.std() * np.sqrt(252) * 100
             st.metric("Annualized Volatility", f"{volatility:.1f}%")
+    
+    show_peer_comparison(
+        esg_events_raw,
+        estimation_window=estimation_window,
+        event_window=event_window,
+        benchmark_data=benchmark_data,
+        peer_panel=snapshot.value['peers'],
+    )
+
+    st.sidebar.caption(
+        f"Price cache: {price_cache_stats.summary()} · Figure cache: {figure_cache.stats.summary()}"
+    )
+    upstream = upstream_summary()
+    if upstream:
+        st.sidebar.caption(f"Upstream prices: {upstream}")
+
+def build_price_chart(telus_data, esg_events, impacts, max_points=DEFAULT_POINT_BUDGET):
+    """Build the Telus price chart with ESG event markers"""
+    
+    fig = go.Figure()
+    
+    # Add real stock price line
+    fig.add_trace(price_trace(
+        telus_data['Close'],
+        max_points=max_points,
+        name='Telus Stock Price',
+        line=dict(color='#4B0F62', width=3),
+        hovertemplate='Date: %{x}<br>Price: $%{y:.2f} CAD<extra></extra>'
+    ))
+    
+    data_start, data_end = telus_data.index[0], telus_data.index[-1]
+    
+    for event, row in zip(esg_events, impacts.itertuples(index=False)):
+        # Only mark events that fall inside our data range
+        if not (data_start <= row.event_date <= data_end):
+            continue
+        
+        closest_date = row.trading_date
+        event_price = row.event_price
+        
+        # Add event marker
+        fig.add_trace(go.Scatter(
+            x=[closest_date],
+            y=[event_price + 0.5],  # Slightly above the price line
+            mode='markers+text',
+            marker=dict(
+                size=25,
+                color=event['color'],
+                symbol='star',
+                line=dict(width=2, color='black')
+            ),
+            text=event['impact'],
+            textposition="top center",
+            textfont=dict(size=12, color='black'),
+            name=f"{event['name']} ({event['date']})",
+            showlegend=True,
+            hovertemplate=f"<b>{event['name']}</b><br>Date: {event['date']}<br>Calculated Impact: {event['impact']}<br>Price: $%{{y:.2f}} CAD<extra></extra>"
+        ))
+        
+        # Add vertical line
+        fig.add_vline(
+            x=closest_date,
+            line_dash="dash",
+            line_color=event['color'],
+            line_width=2,
+            opacity=0.7
+        )
+    
+    # Update chart layout
+    fig.update_layout(
+        title="Telus Stock Price with Calculated ESG Event Impacts",
+        xaxis_title="Date",
+        yaxis_title="Price (CAD)",
+        height=600,
+        showlegend=True,
+        hovermode='x unified'
+    )
+    
+    return fig
+
+def build_peer_chart(panel, max_points=DEFAULT_POINT_BUDGET):
+    """Build the relative-performance chart for a peer panel"""
+    
+    # Relative performance, rebased to 100 at the first common date
+    rebased = panel.dropna()
+    rebased = rebased / rebased.iloc[0] * 100
+    fig = go.Figure()
+    for ticker in rebased.columns:
+        fig.add_trace(price_trace(
+            rebased[ticker],
+            max_points=max_points,
+            name=ticker,
+            line=dict(width=3 if ticker == "T.TO" else 1.5),
+            hovertemplate=f'{ticker}<br>Date: %{{x}}<br>Rebased: %{{y:.1f}}<extra></extra>'
+        ))
+    fig.update_layout(
+        title="Relative Performance vs Peers (rebased to 100)",
+        xaxis_title="Date",
+        yaxis_title="Rebased Price",
+        height=450,
+        hovermode='x unified'
+    )
+    return fig
+
+def show_peer_comparison(esg_events_raw, estimation_window, event_window, benchmark_data, peer_panel):
+    """Compare Telus against its telecom peers on the same ESG event dates"""
+    
+    st.markdown("### 🏢 **Peer Group Comparison**")
+    
+    peers = st.multiselect("Peer group", PEER_TICKERS, default=PEER_TICKERS)
+    if not peers:
+        st.info("Select at least one peer to compare.")
+        return
+    
+    # The refresh job prefetches every peer; keep the selected ones
+    panel = peer_panel[[t for t in ["T.TO"] + peers if t in peer_panel.columns]]
+    
+    if panel.empty:
+        st.error("Unable to fetch peer stock data.")
+        return
+    
+    missing = [t for t in ["T.TO"] + peers if t not in panel.columns]
+    if missing:
+        st.warning(f"No data for: {', '.join(missing)}")
+    
+    fig = cached_figure("peer_chart", (panel,), lambda: build_peer_chart(panel))
+    st.plotly_chart(fig, use_container_width=True)
+    
+    if benchmark_data is None or benchmark_data.empty:
+        return
+    
+    # One stacked market-model study across every peer and event
+    study = panel_event_study(
+        panel, benchmark_data['Close'], [e['date'] for e in esg_events_raw],
+        estimation_window=estimation_window, event_window=event_window,
+    )
+    names = {pd.Timestamp(e['date']): f"{e['name']} ({e['date']})" for e in esg_events_raw}
+    study['ESG Event'] = study['event_date'].dt.tz_localize(None).map(names)
+    car_table = study.pivot_table(index='ESG Event', columns='ticker', values='car', sort=False)
+    
+    st.markdown("**Cumulative abnormal return (%) by peer**")
+    st.dataframe(car_table.round(2), use_container_width=True)
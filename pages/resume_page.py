@@ -1,5 +1,4 @@
 import streamlit as st
-import plotly.graph_objects as go
 from pathlib import Path
 from io import BytesIO
 
@@ -1,59 +1,97 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
+import inspect
 import plotly.graph_objects as go
-import yfinance as yf
-from datetime import datetime, timedelta
+from utils.market_windows import price_cache_stats
+from utils.price_store import upstream_summary
+from utils.chart_utils import DEFAULT_POINT_BUDGET, payload_report, price_trace
+from utils.figure_cache import cached_figure, figure_cache
+from utils.forecasting import fit_forecast, get_worker
+from utils.forecast_store import live_forecast_store, to_wide
+from utils.forecast_accuracy import decay_curve, get_accuracy_tracker
+from utils.refresh_scheduler import get_scheduler
+from utils.prefetch import register_prefetch_jobs
 import warnings
 warnings.filterwarnings('ignore')
 
 def show():
     """Display Telus stock forecasting with custom AutoARIMA model"""
     
+    # Normally done by the router; makes the page work on its own too
+    register_prefetch_jobs(["telus_forecasts"])
+    
     st.markdown('<h1 class="main-header">🔮 Telus Stock Price Forecasting with AutoARIMA</h1>', unsafe_allow_html=True)
     
-    # Load forecast data and real stock data
-    forecast_data = load_forecast_data()
+    # Load the live model (fitted in the background) and real stock data
     stock_data = fetch_telus_data()
+    forecast_result = load_live_forecast("T.TO")
+    
+    if forecast_result is not None:
+        forecast_data = forecast_result.forecast
+        update = "incremental update" if forecast_result.update_kind == "incremental" else "full AutoARIMA search"
+        st.caption(
+            f"Model updated {forecast_result.fitted_at:%Y-%m-%d %H:%M} ET on data through "
+            f"{forecast_result.last_bar:%Y-%m-%d} ({update}, {forecast_result.fit_seconds:.1f}s)."
+        )
+    else:
+        # No fitted model yet: fall back to the saved offline forecast
+        st.info("Fitting AutoARIMA in the background — showing the last batch forecast until it finishes.")
+        forecast_data = load_forecast_data()
     
     if forecast_data is not None and stock_data is not None:
-        show_forecast_analysis(stock_data, forecast_data)
+        show_forecast_analysis(stock_data, forecast_data, forecast_result)
+        show_model_tournament(stock_data)
+        show_forecast_accuracy(stock_data)
     else:
         st.error("Unable to load forecast or stock data")
 
-@st.cache_data
-def load_forecast_data():
-    """Load the custom AutoARIMA forecast data"""
+    st.sidebar.caption(
+        f"Price cache: {price_cache_stats.summary()} · Figure cache: {figure_cache.stats.summary()}"
+    )
+    upstream = upstream_summary()
+    if upstream:
+        st.sidebar.caption(f"Upstream prices: {upstream}")
+
+def load_forecast_data(ticker="T.TO", model="AutoARIMA"):
+    """Load the latest batch forecast of one ticker and model from the forecast store"""
     try:
-        # Read the forecast CSV
-        forecast_df = pd.read_csv('T.TO.csv')
-        forecast_df['ds'] = pd.to_datetime(forecast_df['ds'])
-        return forecast_df
+        # Only the vintage column is read here, so new vintages show up on the next rerun
+        vintages = live_forecast_store().vintages(ticker, model)
+        if vintages.empty:
+            st.warning(f"No stored {model} forecast for {ticker}")
+            return None
+        return read_forecast_vintage(ticker, model, vintages['vintage'].max())
     except Exception as e:
         st.error(f"Error loading forecast data: {e}")
         return None
 
 @st.cache_data
-def fetch_telus_data():
-    """Fetch real Telus stock data from Yahoo Finance"""
+def read_forecast_vintage(ticker, model, vintage):
+    """One stored vintage in wide layout; vintages are immutable, so caching by vintage is safe"""
+    # Only the matching ticker/model partition and vintage are scanned
+    return to_wide(live_forecast_store().read(ticker, model, vintage=vintage), model)
+
+def load_live_forecast(ticker):
+    """Latest persisted AutoARIMA forecast; refits are scheduled by the refresh job"""
     try:
-        ticker = "T.TO"
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=2*365)  # 2 years of data
-        
-        telus = yf.Ticker(ticker)
-        hist = telus.history(start=start_date, end=end_date)
-        
-        if not hist.empty:
-            return hist
-        else:
-            return None
-            
+        return get_worker().latest(ticker)
     except Exception as e:
-        st.error(f"Error fetching stock data: {e}")
+        st.warning(f"Live forecast unavailable: {e}")
         return None
 
-def show_forecast_analysis(stock_data, forecast_data):
+def fetch_telus_data():
+    """Latest Telus stock data snapshot from the background refresh job"""
+    scheduler = get_scheduler()
+    with st.spinner("Fetching real Telus stock data..."):
+        snapshot = scheduler.wait_for("telus_forecasts")
+    if snapshot is None or snapshot.value.empty:
+        error = scheduler.last_error.get("telus_forecasts")
+        if error:
+            st.error(f"Error fetching stock data: {error}")
+        return None
+    st.caption(snapshot.describe())
+    return snapshot.value
+
+def show_forecast_analysis(stock_data, forecast_data, forecast_result=None):
     """Display the complete forecast analysis"""
     
     # Current stock metrics
@@ -102,26 +140,88 @@ def show_forecast_analysis(stock_data, forecast_data):
     # Main forecast visualization
     st.markdown("### 📈 **Telus Stock Price: Historical Data + AutoARIMA Forecast**")
     
-    # Create the main chart
+    # Reruns that don't change the chart inputs reuse the already-built figure
+    fig = cached_figure(
+        "forecast_chart",
+        (stock_data['Close'], forecast_data),
+        lambda: build_forecast_chart(stock_data, forecast_data),
+    )
+    
+    if st.sidebar.checkbox("Show chart payload stats"):
+        st.sidebar.caption(payload_report(
+            lambda max_points: build_forecast_chart(stock_data, forecast_data, max_points)
+        ))
+    
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Forecast Analysis
+    st.markdown("### 🎯 **Forecast Analysis & Insights**")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.markdown("#### 📊 **Current vs Forecast**")
+        
+        if len(forecast_data) > 0:
+            forecast_end = forecast_data['AutoARIMA'].iloc[-1]
+            total_change = ((forecast_end - current_price) / current_price) * 100
+            
+            st.metric("Current Price", f"${current_price:.2f} CAD")
+            st.metric("6-Month Target", f"${forecast_end:.2f} CAD", f"{total_change:+.1f}%")
+            
+    
+    with col2:
+        st.markdown("#### 📈 **Forecast Statistics**")
+        
+        if len(forecast_data) > 0:
+            forecast_values = forecast_data['AutoARIMA'].values
+            
+            st.metric("Forecast Horizon", f"{len(forecast_data)} trading days")
+            st.metric("Price Range", f"${forecast_values.min():.2f} - ${forecast_values.max():.2f}")
+            st.metric("Forecast Volatility", f"${forecast_values.std():.2f}")
+            
+            # Trend analysis
+            trend = "Upward" if forecast_values[-1] > forecast_values[0] else "Downward"
+            trend_strength = abs((forecast_values[-1] - forecast_values[0]) / forecast_values[0]) * 100
+            st.metric("Overall Trend", f"{trend} ({trend_strength:.1f}%)")
+    
+    with col3:
+        st.markdown("#### 🤖 **Model Performance**")
+        
+        st.metric("Model Type", "AutoARIMA")
+        if forecast_result is not None:
+            st.metric("Fitted Model", forecast_result.model_string)
+            st.metric("Training Data Points Used", f"{forecast_result.n_train} days")
+            
+            # Hold-out accuracy on the last HOLDOUT_DAYS trading days
+            st.metric("Hold-out MAE", f"{forecast_result.mae:.2f} CAD")
+            st.metric("Hold-out MAPE", f"{forecast_result.mape:.1f}%")
+        else:
+            st.metric("Fitted Model", "Fitting…")
+
+    with st.expander("Show AutoARIMA Model Code"):
+        st.code(inspect.getsource(fit_forecast), language="python")
+
+def build_forecast_chart(stock_data, forecast_data, max_points=DEFAULT_POINT_BUDGET):
+    """Build the historical price + AutoARIMA forecast chart"""
+    
     fig = go.Figure()
     
     # Historical stock data (last 18 months for context)
     historical_data = stock_data.tail(252 + 126)  # ~18 months
     
-    fig.add_trace(go.Scatter(
-        x=historical_data.index,
-        y=historical_data['Close'],
-        mode='lines',
+    fig.add_trace(price_trace(
+        historical_data['Close'],
+        max_points=max_points,
         name='Historical Telus Stock Price',
         line=dict(color='#4B0F62', width=3),
         hovertemplate='Date: %{x}<br>Price: $%{y:.2f} CAD<extra></extra>'
     ))
     
     # AutoARIMA forecast
-    fig.add_trace(go.Scatter(
-        x=forecast_data['ds'],
-        y=forecast_data['AutoARIMA'],
-        mode='lines',
+    fig.add_trace(price_trace(
+        forecast_data.set_index('ds')['AutoARIMA'],
+        max_points=max_points,
         name='AutoARIMA Forecast',
         line=dict(color='red', width=3, dash='dash'),
         hovertemplate='Date: %{x}<br>Forecast: $%{y:.2f} CAD<extra></extra>'
@@ -138,38 +238,31 @@ def show_forecast_analysis(stock_data, forecast_data):
             annotation_position="top right"
         )
     
-    # Add confidence bands (approximate based on historical volatility)
-    if len(forecast_data) > 0:
-        # Calculate historical volatility for confidence bands
-        daily_returns = stock_data['Close'].pct_change().dropna()
-        volatility = daily_returns.std()
-        
-        # Create expanding confidence bands
-        forecast_values = forecast_data['AutoARIMA'].values
-        confidence_multiplier = np.sqrt(np.arange(1, len(forecast_values) + 1)) * volatility
-        
-        upper_band = forecast_values * (1 + 1.96 * confidence_multiplier)
-        lower_band = forecast_values * (1 - 1.96 * confidence_multiplier)
+    # Model prediction intervals, precomputed with the forecast (widest first)
+    for level, opacity in ((95, 0.15), (80, 0.25)):
+        lo, hi = f'AutoARIMA-lo-{level}', f'AutoARIMA-hi-{level}'
+        if lo not in forecast_data or hi not in forecast_data:
+            continue
         
-        # Upper confidence band
+        # Upper band
         fig.add_trace(go.Scatter(
             x=forecast_data['ds'],
-            y=upper_band,
+            y=forecast_data[hi],
             mode='lines',
             line=dict(width=0),
             showlegend=False,
             hoverinfo='skip'
         ))
         
-        # Lower confidence band with fill
+        # Lower band with fill
         fig.add_trace(go.Scatter(
             x=forecast_data['ds'],
-            y=lower_band,
+            y=forecast_data[lo],
             mode='lines',
             fill='tonexty',
-            fillcolor='rgba(255,0,0,0.2)',
+            fillcolor=f'rgba(255,0,0,{opacity})',
             line=dict(width=0),
-            name='95% Confidence Interval',
+            name=f'{level}% Prediction Interval',
             hoverinfo='skip'
         ))
     
@@ -182,115 +275,149 @@ def show_forecast_analysis(stock_data, forecast_data):
         hovermode='x unified'
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+def show_model_tournament(stock_data):
+    """Rank several statsforecast models with rolling-origin cross-validation"""
     
-    # Forecast Analysis
-    st.markdown("### 🎯 **Forecast Analysis & Insights**")
+    st.markdown("### 🏁 **Model Tournament**")
     
-    col1, col2, col3 = st.columns(3)
+    try:
+        tournament = get_worker().latest("T.TO.tournament")
+    except Exception as e:
+        st.warning(f"Model tournament unavailable: {e}")
+        return
     
-    with col1:
-        st.markdown("#### 📊 **Current vs Forecast**")
-        
-        if len(forecast_data) > 0:
-            forecast_end = forecast_data['AutoARIMA'].iloc[-1]
-            total_change = ((forecast_end - current_price) / current_price) * 100
-            
-            st.metric("Current Price", f"${current_price:.2f} CAD")
-            st.metric("6-Month Target", f"${forecast_end:.2f} CAD", f"{total_change:+.1f}%")
-            
+    if tournament is None:
+        st.info("AutoARIMA, AutoETS, AutoTheta and SeasonalNaive are being fitted in parallel in the background.")
+        return
     
-    with col2:
-        st.markdown("#### 📈 **Forecast Statistics**")
-        
-        if len(forecast_data) > 0:
-            forecast_values = forecast_data['AutoARIMA'].values
-            
-            st.metric("Forecast Horizon", f"{len(forecast_data)} trading days")
-            st.metric("Price Range", f"${forecast_values.min():.2f} - ${forecast_values.max():.2f}")
-            st.metric("Forecast Volatility", f"${forecast_values.std():.2f}")
-            
-            # Trend analysis
-            trend = "Upward" if forecast_values[-1] > forecast_values[0] else "Downward"
-            trend_strength = abs((forecast_values[-1] - forecast_values[0]) / forecast_values[0]) * 100
-            st.metric("Overall Trend", f"{trend} ({trend_strength:.1f}%)")
+    leaderboard = tournament.leaderboard.rename(columns={
+        'rank': 'Rank', 'model': 'Model', 'mae': 'Backtest MAE (CAD)',
+        'mape': 'Backtest MAPE (%)', 'folds': 'Folds', 'fit_seconds': 'Fit Time (s)'
+    })[['Rank', 'Model', 'Backtest MAE (CAD)', 'Backtest MAPE (%)', 'Folds', 'Fit Time (s)']]
+    st.dataframe(leaderboard.round(3), use_container_width=True, hide_index=True)
+    st.caption(
+        f"Rolling-origin backtest on month-end cutoffs; {tournament.leaderboard.shape[0]} models fitted "
+        f"in parallel in {tournament.wall_seconds:.1f}s on data through {tournament.last_bar:%Y-%m-%d}."
+    )
     
-    with col3:
-        st.markdown("#### 🤖 **Model Performance**")
-        
-        st.metric("Model Type", "AutoARIMA")
-        st.metric("Fitted Model", "ARIMA(0,1,1)(0,1,0)[365]")
-        st.metric("Training Data Points Used", f"752 days")
-        
-        # Data quality
-        st.metric("MAE", "1.35 CAD")
-        st.metric("MAPE", "6.1%")
-
-    with st.expander("Show AutoARIMA Model Code"):
-        st.code("""
-    import yfinance as yf
-    from statsforecast import StatsForecast
-    from statsforecast.models import AutoARIMA
-    from datetime import datetime, timedelta
-    from statsmodels.graphics.tsaplots import plot_acf
-    from statsmodels.graphics.tsaplots import plot_pacf
-    from statsmodels.tsa.seasonal import seasonal_decompose
-    from statsforecast.arima import arima_string
-    from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error
-    import seaborn as sns
-    import scipy.stats as stats
-
-    # Collect data
-    ticker = "T.TO"
-            
-    # Get 3 years of data for robust forecasting
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=3*365)
-
-    # Fetch data
-    telus = yf.Ticker(ticker)
-    hist = telus.history(start=start_date, end=end_date)
-
-    # Prepare data for StatsForecast
-    hist["unique_id"] = ticker
-    hist = hist.reset_index()
-    hist = hist[["Date", "Close", "unique_id"]]
-    hist.columns = ["ds", "y", "unique_id"]
+    col1, col2 = st.columns(2)
+    with col1:
+        fig = cached_figure(
+            "tournament_chart",
+            (stock_data['Close'], tournament.forecasts),
+            lambda: build_tournament_chart(stock_data, tournament),
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        fig = cached_figure(
+            "error_curve_chart",
+            (tournament.curves,),
+            lambda: build_error_curve_chart(tournament.curves),
+        )
+        st.plotly_chart(fig, use_container_width=True)
 
-    # Train & Test split
-    Y_train_df = hist[hist.ds<='2025-06-30'] 
-    Y_test_df = hist[hist.ds>'2025-06-30']
 
+def build_tournament_chart(stock_data, tournament, max_points=DEFAULT_POINT_BUDGET):
+    """Overlay every tournament model's forecast on recent history"""
+    
+    fig = go.Figure()
+    historical_data = stock_data.tail(252)  # ~12 months
+    fig.add_trace(price_trace(
+        historical_data['Close'],
+        max_points=max_points,
+        name='Historical Telus Stock Price',
+        line=dict(color='#4B0F62', width=3),
+        hovertemplate='Date: %{x}<br>Price: $%{y:.2f} CAD<extra></extra>'
+    ))
     
-    Y_train_df["ds"] = pd.to_datetime(Y_train_df["ds"])
+    forecasts = tournament.forecasts.set_index('ds')
+    winner = tournament.leaderboard['model'].iloc[0]
+    for model in tournament.leaderboard['model']:
+        fig.add_trace(price_trace(
+            forecasts[model],
+            max_points=max_points,
+            name=f"{model} (best)" if model == winner else model,
+            line=dict(width=3 if model == winner else 1.5, dash='dash'),
+            hovertemplate=f'{model}<br>Date: %{{x}}<br>Forecast: $%{{y:.2f}} CAD<extra></extra>'
+        ))
+    
+    fig.update_layout(
+        title="Model Tournament: Forecast Overlay",
+        xaxis_title="Date",
+        yaxis_title="Price (CAD)",
+        height=500,
+        showlegend=True,
+        hovermode='x unified'
+    )
+    return fig
 
-    season_length = 365 # Daily data 
-    horizon = len(Y_test_df) # number of predictions
+def build_error_curve_chart(curves):
+    """Backtest MAE by forecast step for each model"""
+    
+    fig = go.Figure()
+    for model, curve in curves.groupby('model'):
+        fig.add_trace(go.Scatter(
+            x=curve['step'],
+            y=curve['mae'],
+            mode='lines+markers',
+            name=model,
+            hovertemplate=f'{model}<br>Step: %{{x}} days<br>MAE: $%{{y:.2f}} CAD<extra></extra>'
+        ))
+    fig.update_layout(
+        title="Backtest Error by Forecast Horizon",
+        xaxis_title="Trading days ahead",
+        yaxis_title="MAE (CAD)",
+        height=500,
+        hovermode='x unified'
+    )
+    return fig
 
-    # Fit AutoARIMA model
-    models = [AutoARIMA(season_length=season_length, D=1)]
-    sf = StatsForecast(models=models, freq='D')
-    sf.fit(df=Y_train_df)
-    arima_string(sf.fitted_[0,0].model_)
 
-    # Validate model on test set
-    Y_hat_df_test = sf.forecast(df=Y_train_df, h=horizon, fitted=True)
-        pred_col = [c for c in Y_hat_df_test.columns if c not in ('unique_id','ds') and 'lo' not in c and 'hi' not in c][0]
-    eval_df = (
-        Y_hat_df_test.merge(Y_test_df[['ds','y']], on='ds', how='left', suffixes=('_hat',''))
-                .dropna(subset=['y'])
+def show_forecast_accuracy(stock_data):
+    """Realized error of past forecast vintages as closes come in"""
+    
+    st.markdown("### 🎯 **Forecast Accuracy Over Time**")
+    
+    try:
+        # Scored incrementally by the background refresh job
+        scores = get_accuracy_tracker().scores("T.TO")
+    except Exception as e:
+        st.warning(f"Forecast accuracy unavailable: {e}")
+        return
+    
+    if scores.empty:
+        st.info("No stored forecast has reached a realized close yet.")
+        return
+    
+    curve = decay_curve(scores)
+    fig = cached_figure("accuracy_decay_chart", (curve,), lambda: build_accuracy_decay_chart(curve))
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(
+        f"{scores['vintage'].nunique()} forecast vintages scored on {len(scores):,} realized closes "
+        f"through {scores['ds'].max():%Y-%m-%d}."
     )
 
-    y_true = eval_df['y'].values
-    y_pred = eval_df[pred_col].values
-
-    # Calculate error metrics
-    mae = mean_absolute_error(y_true, y_pred)
-    mape = mean_absolute_percentage_error(y_true, y_pred) * 100  # sklearn returns a fraction
-    print(f"MAE: {mae:.2f} CAD")
-    print(f"MAPE: {mape:.2f}%")
-                
-    # Forecast future values
-    horizon=100
-    Y_hat_df = sf.forecast(df=Y_train_df, h=horizon, fitted=True)
-    Y_hat_df.head())""")
\ No newline at end of file
+def build_accuracy_decay_chart(curve):
+    """Realized MAPE by forecast step, averaged over stored vintages"""
+    
+    fig = go.Figure()
+    for model, rows in curve.groupby('model'):
+        fig.add_trace(go.Scatter(
+            x=rows['step'],
+            y=rows['mape'],
+            mode='lines+markers',
+            name=model,
+            customdata=rows[['mae', 'vintages']].to_numpy(),
+            hovertemplate=(f'{model}<br>Step: %{{x}} days<br>MAPE: %{{y:.2f}}%'
+                           '<br>MAE: $%{customdata[0]:.2f} CAD<br>Vintages: %{customdata[1]}<extra></extra>')
+        ))
+    fig.update_layout(
+        title="Realized Accuracy Decay by Forecast Horizon",
+        xaxis_title="Trading days ahead",
+        yaxis_title="MAPE (%)",
+        height=450,
+        hovermode='x unified'
+    )
+    return fig
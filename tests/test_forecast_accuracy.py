@@ -0,0 +1,51 @@
+import pandas as pd
+
+import utils.forecast_accuracy as forecast_accuracy
+from utils.forecast_accuracy import AccuracyTracker
+from utils.forecast_store import ForecastStore
+
+DAYS = pd.bdate_range('2025-09-01', periods=12)
+
+
+def _tracker(tmp_path):
+    store = ForecastStore(tmp_path / 'forecasts')
+    store.write(pd.DataFrame({
+        'ticker': 'T.TO', 'model': 'AutoARIMA', 'vintage': pd.Timestamp('2025-08-29'),
+        'ds': DAYS[1:], 'yhat': 10.0,
+        'lo_80': float('nan'), 'hi_80': float('nan'), 'lo_95': float('nan'), 'hi_95': float('nan'),
+    }))
+    return AccuracyTracker(store, root=tmp_path / 'accuracy')
+
+
+def test_provisional_close_is_scored_once_final(tmp_path):
+    tracker = _tracker(tmp_path)
+    today = DAYS[3]
+    closes = pd.Series([10.0, 11.0, 12.0, 13.0], index=DAYS[:4])
+
+    # DAYS[3] is still trading: its close is provisional and must not be scored
+    assert tracker.update('T.TO', closes, final_through=DAYS[2]) == 2
+    assert tracker.scores('T.TO')['ds'].max() == DAYS[2]
+
+    # Next day the settled close differs from the intraday one
+    closes[today] = 15.0
+    closes[DAYS[4]] = 16.0
+    assert tracker.update('T.TO', closes, final_through=today) == 1
+
+    scores = tracker.scores('T.TO').set_index('ds')
+    assert scores.loc[today, 'y'] == 15.0
+    assert not scores.index.duplicated().any()
+
+
+def test_compaction_merges_every_fragment(tmp_path, monkeypatch):
+    monkeypatch.setattr(forecast_accuracy, 'COMPACT_AFTER', 2)
+    tracker = _tracker(tmp_path)
+    closes = pd.Series(range(len(DAYS)), index=DAYS, dtype=float)
+
+    for day in DAYS[1:]:
+        tracker.update('T.TO', closes, final_through=day)
+        assert len(tracker._fragments('T.TO')) <= 2
+
+    scores = tracker.scores('T.TO')
+    assert sorted(scores['ds']) == list(DAYS[1:])
+    # The sidecar matches watermarks rebuilt from the scores themselves
+    assert tracker._load_watermarks('T.TO') == tracker._watermarks(scores)
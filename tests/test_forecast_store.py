@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pandas as pd
+
+from utils.forecast_store import ForecastStore, migrate_csv
+
+LEGACY_CSV = Path(__file__).resolve().parent.parent / 'T.TO.csv'
+
+
+def test_migrated_legacy_csv_has_one_row_per_day(tmp_path):
+    forecasts = migrate_csv(LEGACY_CSV, ForecastStore(tmp_path))
+
+    assert not forecasts.duplicated(['ticker', 'model', 'ds']).any()
+    assert (forecasts['ds'].diff().dropna() == pd.Timedelta(days=1)).all()
+
+
+def test_dst_evening_timestamp_maps_to_next_day(tmp_path):
+    csv = tmp_path / 'legacy.csv'
+    csv.write_text(
+        ",unique_id,ds,AutoARIMA\n"
+        "0,T.TO,2025-11-01 00:00:00-04:00,1.0\n"
+        "1,T.TO,2025-11-02 00:00:00-04:00,2.0\n"
+        "2,T.TO,2025-11-02 23:00:00-05:00,3.0\n"
+    )
+    forecasts = migrate_csv(csv, ForecastStore(tmp_path / 'store'))
+
+    assert list(forecasts['ds'].dt.strftime('%Y-%m-%d')) == ['2025-11-01', '2025-11-02', '2025-11-03']
+    assert list(forecasts['yhat']) == [1.0, 2.0, 3.0]
+
+
+def test_committed_vintage_has_one_row_per_day():
+    stored = ForecastStore().read('T.TO', 'AutoARIMA', vintage='2025-09-12')
+
+    assert not stored.empty
+    assert not stored['ds'].duplicated().any()
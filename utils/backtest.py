@@ -0,0 +1,184 @@
+"""Rolling-origin backtesting with an on-disk fold cache.
+
+A fold is one (ticker, model, cutoff, horizon) combination: the model is
+trained on bars up to and including ``cutoff`` and scored on the next
+``horizon`` trading days. Each fold is written to its own Parquet file, so
+adding a cutoff or a model only computes the folds that are missing.
+
+Cutoffs are anchored to month-end trading days rather than counted back from
+the latest bar; a new daily bar therefore leaves every existing fold valid.
+"""
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.market_windows import last_final_day
+
+logger = logging.getLogger(__name__)
+
+BACKTEST_DIR = Path(__file__).resolve().parent.parent / '.cache' / 'backtest'
+MIN_TRAIN_DAYS = 252
+FREQ = 'B'
+
+
+def model_name(model):
+    """Display/cache name for a statsforecast model instance or class name"""
+    return model if isinstance(model, str) else getattr(model, 'alias', type(model).__name__)
+
+
+def process_context():
+    """
+    Start method for model worker processes
+
+    Pools are started from the forecast worker thread inside the Streamlit
+    server, and forking a process with that many live threads can deadlock
+    the child, so workers come from a forkserver (spawn where unavailable).
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def _make(model, season_length):
+    if not isinstance(model, str):
+        return model
+    from statsforecast import models
+
+    return getattr(models, model)(season_length=season_length)
+
+
+def rolling_cutoffs(ds, horizon, n_cutoffs, min_train=MIN_TRAIN_DAYS):
+    """
+    Last ``n_cutoffs`` month-end trading days with ``horizon`` realized bars after them
+
+    Only completed sessions count as realized: a fold is cached for good, so
+    it must never be scored against the current session's unfinished bar.
+    """
+    ds = pd.DatetimeIndex(ds)
+    final = int(ds.searchsorted(last_final_day(), side='right'))  # bars up to the last final day
+    month_ends = pd.Series(np.arange(len(ds)), index=ds).groupby(ds.to_period('M')).max()
+    positions = month_ends[(month_ends >= min_train - 1) & (month_ends + horizon < final)]
+    return list(ds[positions.to_numpy()[-n_cutoffs:]])
+
+
+class FoldCache:
+    """Parquet file per fold under ``root/ticker/model/h<horizon>/<cutoff>.parquet``"""
+
+    def __init__(self, root=BACKTEST_DIR):
+        self.root = Path(root)
+
+    def path(self, ticker, model, cutoff, horizon):
+        safe_ticker = ticker.replace('^', '_')
+        return self.root / safe_ticker / model / f"h{horizon}" / f"{pd.Timestamp(cutoff):%Y%m%d}.parquet"
+
+    def get(self, ticker, model, cutoff, horizon):
+        path = self.path(ticker, model, cutoff, horizon)
+        if not path.exists():
+            return None
+        return pd.read_parquet(path)
+
+    def put(self, ticker, model, cutoff, horizon, fold):
+        path = self.path(ticker, model, cutoff, horizon)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        fold.to_parquet(tmp, index=False)
+        tmp.replace(path)
+
+
+def run_fold(model, df, cutoff, horizon, season_length=5):
+    """Train on ``df`` up to ``cutoff`` and score the next ``horizon`` bars"""
+    from statsforecast import StatsForecast
+
+    model = _make(model, season_length)
+    name = model_name(model)
+    train = df[df['ds'] <= cutoff]
+    actual = df[df['ds'] > cutoff].head(horizon)
+    sf = StatsForecast(models=[model], freq=FREQ)
+    y_hat = sf.fit(df=train).predict(h=horizon)[name].to_numpy()
+    # Align by trading-day step, since the forecast calendar ignores holidays
+    return pd.DataFrame({
+        'model': name,
+        'cutoff': pd.Timestamp(cutoff),
+        'step': np.arange(1, len(actual) + 1),
+        'ds': actual['ds'].to_numpy(),
+        'y': actual['y'].to_numpy(),
+        'y_hat': y_hat[:len(actual)],
+    })
+
+
+def _run_folds(model, df, cutoffs, horizon, season_length):
+    """Compute several folds of one model in a worker process"""
+    return [run_fold(model, df, cutoff, horizon, season_length) for cutoff in cutoffs]
+
+
+def backtest(df, ticker, models, cutoffs, horizon, cache=None, season_length=5, max_workers=None):
+    """
+    Evaluate ``models`` on every cutoff, computing only folds missing from ``cache``
+
+    Parameters:
+    - df: long ``unique_id, ds, y`` frame for one ticker
+    - models: statsforecast model instances or class names
+    - cutoffs: training end dates (see ``rolling_cutoffs``)
+    - horizon: trading days scored after each cutoff
+
+    Returns:
+    - long DataFrame of folds: model, cutoff, step, ds, y, y_hat
+    """
+    cache = cache if cache is not None else FoldCache()
+    folds, missing = [], {}
+    for model in models:
+        name = model_name(model)
+        for cutoff in cutoffs:
+            fold = cache.get(ticker, name, cutoff, horizon)
+            if fold is None:
+                missing.setdefault(name, (model, []))[1].append(cutoff)
+            else:
+                folds.append(fold)
+
+    if missing:
+        started = time.perf_counter()
+        max_workers = max_workers or min(len(missing), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=process_context()) as pool:
+            futures = {
+                name: pool.submit(_run_folds, model, df, todo, horizon, season_length)
+                for name, (model, todo) in missing.items()
+            }
+            for name, future in futures.items():
+                for cutoff, fold in zip(missing[name][1], future.result()):
+                    cache.put(ticker, name, cutoff, horizon, fold)
+                    folds.append(fold)
+        logger.info("Backtest %s: computed %d missing folds in %.1fs (%d cached)",
+                    ticker, sum(len(todo) for _, todo in missing.values()),
+                    time.perf_counter() - started, len(folds) - sum(len(t) for _, t in missing.values()))
+
+    if not folds:
+        return pd.DataFrame(columns=['model', 'cutoff', 'step', 'ds', 'y', 'y_hat'])
+    return pd.concat(folds, ignore_index=True)
+
+
+def _with_errors(folds):
+    folds = folds.assign(abs_error=(folds['y'] - folds['y_hat']).abs())
+    return folds.assign(ape=folds['abs_error'] / folds['y'].abs() * 100)
+
+
+def error_curves(folds):
+    """Per-model, per-horizon-step MAE and MAPE across all folds"""
+    return (
+        _with_errors(folds)
+        .groupby(['model', 'step'], as_index=False)
+        .agg(mae=('abs_error', 'mean'), mape=('ape', 'mean'), folds=('cutoff', 'nunique'))
+    )
+
+
+def summarize(folds):
+    """Per-model MAE and MAPE over every fold and step"""
+    return (
+        _with_errors(folds)
+        .groupby('model', as_index=False)
+        .agg(mae=('abs_error', 'mean'), mape=('ape', 'mean'), folds=('cutoff', 'nunique'))
+    )
@@ -0,0 +1,97 @@
+"""Carbon-price scenario engine.
+
+A scenario is one carbon-price path, one emissions trajectory and one
+discount rate over the years ``start_year..end_year``. ``ScenarioGrid``
+holds every path, trajectory and rate as matrices, and ``evaluate`` prices
+all combinations in one NumPy broadcast::
+
+    cost[p, e, t] = price[p, t] * emissions[e, t]
+    npv[p, e, d]  = sum_t cost[p, e, t] / (1 + rate[d]) ** (t + 1)
+
+Prices are CAD per tCO2e and, like the dashboard's single-price estimate,
+apply to all Scope 1+2 emissions.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+# Federal benchmark: $65/t in 2023 rising $15/t a year to $170/t in 2030
+FEDERAL_SCHEDULE = {2023: 65, 2024: 80, 2025: 95, 2026: 110, 2027: 125, 2028: 140, 2029: 155, 2030: 170}
+FLAT_PRICES = np.arange(0, 301, 25)
+RAMP_TARGETS = np.arange(100, 301, 25)  # price reached in end_year, ramping linearly from start price
+DECLINE_RATES = np.arange(0, 0.101, 0.01)  # annual emissions decline
+DISCOUNT_RATES = np.round(np.arange(0.02, 0.121, 0.01), 2)
+
+
+def federal_path(years):
+    """Federal benchmark price per year, held at the 2030 level afterwards"""
+    first, last = min(FEDERAL_SCHEDULE), max(FEDERAL_SCHEDULE)
+    return np.array([FEDERAL_SCHEDULE[min(max(y, first), last)] for y in years], dtype=float)
+
+
+@dataclass
+class ScenarioGrid:
+    years: np.ndarray  # (T,)
+    price_names: list
+    prices: np.ndarray  # (P, T) CAD/tCO2e
+    trajectory_names: list
+    emissions: np.ndarray  # (E, T) tCO2e
+    rates: np.ndarray  # (D,)
+
+    @property
+    def size(self):
+        return len(self.price_names) * len(self.trajectory_names) * len(self.rates)
+
+    def discount_factors(self):
+        """(D, T) end-of-year discount factors"""
+        t = np.arange(1, len(self.years) + 1)
+        return (1 + self.rates[:, None]) ** -t[None, :]
+
+    def annual_costs(self):
+        """(P, E, T) undiscounted carbon cost per year"""
+        return self.prices[:, None, :] * self.emissions[None, :, :]
+
+    def evaluate(self):
+        """(P, E, D) NPV of carbon cost for every scenario"""
+        return np.einsum('pt,et,dt->ped', self.prices, self.emissions, self.discount_factors(), optimize=True)
+
+
+def build_grid(base_emissions, start_year, end_year=2030, current_price=None,
+               flat_prices=FLAT_PRICES, ramp_targets=RAMP_TARGETS,
+               decline_rates=DECLINE_RATES, discount_rates=DISCOUNT_RATES, extra_trajectories=None):
+    """
+    Standard scenario grid starting from ``base_emissions`` (tCO2e in ``start_year - 1``)
+
+    Price paths: flat prices, linear ramps from ``current_price`` (default:
+    the federal price in ``start_year``) to each ramp target in ``end_year``,
+    and the federal schedule. Trajectories: constant annual declines, plus
+    any ``extra_trajectories`` given as ``{name: (T,) array}``.
+    """
+    years = np.arange(start_year, end_year + 1)
+    federal = federal_path(years)
+    start_price = federal[0] if current_price is None else current_price
+    progress = np.linspace(0, 1, len(years)) if len(years) > 1 else np.ones(1)
+
+    price_names = [f"Flat ${p:.0f}" for p in flat_prices]
+    price_names += [f"Ramp to ${p:.0f}" for p in ramp_targets]
+    price_names.append("Federal schedule")
+    prices = np.vstack([
+        np.repeat(np.asarray(flat_prices, dtype=float)[:, None], len(years), axis=1),
+        start_price + (np.asarray(ramp_targets, dtype=float)[:, None] - start_price) * progress[None, :],
+        federal[None, :],
+    ])
+
+    steps = np.arange(1, len(years) + 1)
+    trajectory_names = [f"{r:.0%}/yr decline" for r in decline_rates]
+    emissions = base_emissions * (1 - np.asarray(decline_rates)[:, None]) ** steps[None, :]
+    for name, path in (extra_trajectories or {}).items():
+        trajectory_names.append(name)
+        emissions = np.vstack([emissions, np.asarray(path, dtype=float)[None, :]])
+
+    return ScenarioGrid(years, price_names, prices, trajectory_names, emissions, np.asarray(discount_rates, dtype=float))
+
+
+def fan_percentiles(grid, percentiles=(5, 25, 50, 75, 95)):
+    """(len(percentiles), T) annual-cost percentiles across every price path and trajectory"""
+    costs = grid.annual_costs().reshape(-1, len(grid.years))
+    return np.percentile(costs, percentiles, axis=0)
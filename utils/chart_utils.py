@@ -0,0 +1,91 @@
+"""Helpers for keeping Plotly price charts small.
+
+Long daily (or intraday) histories are downsampled with
+Largest-Triangle-Three-Buckets before they become traces, so the JSON sent to
+the browser stays within a fixed point budget while keeping the visual shape
+of the series. Traces that still exceed ``SCATTERGL_THRESHOLD`` points are
+rendered with WebGL.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+DEFAULT_POINT_BUDGET = 1500
+SCATTERGL_THRESHOLD = 5000
+
+
+def lttb_indices(x, y, n_out):
+    """Indices of the ``n_out`` points LTTB keeps from ``(x, y)``"""
+    n = len(y)
+    if n_out is None or n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo = hi
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        # Pick the point forming the largest triangle with the previous pick
+        # and the average of the next bucket
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample(series, max_points=DEFAULT_POINT_BUDGET):
+    """LTTB-downsample a Series with a DatetimeIndex (or numeric index)"""
+    series = series.dropna()
+    index = series.index
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy()
+    keep = lttb_indices(x, series.to_numpy(), max_points)
+    return series.iloc[keep]
+
+
+def price_trace(series, max_points=DEFAULT_POINT_BUDGET, **kwargs):
+    """Line trace for a price Series, downsampled to ``max_points``.
+
+    Switches to ``go.Scattergl`` when the trace is still large after
+    downsampling (e.g. ``max_points=None``).
+    """
+    series = downsample(series, max_points)
+    trace_type = go.Scattergl if len(series) > SCATTERGL_THRESHOLD else go.Scatter
+    kwargs.setdefault('mode', 'lines')
+    return trace_type(x=series.index, y=series.to_numpy(), **kwargs)
+
+
+def payload_stats(fig):
+    """Serialized figure size (bytes) and serialization time (ms)"""
+    started = time.perf_counter()
+    payload = fig.to_json()
+    return len(payload.encode('utf-8')), (time.perf_counter() - started) * 1000
+
+
+def payload_report(build_figure, max_points=DEFAULT_POINT_BUDGET):
+    """Compare a chart built at full resolution with the downsampled one.
+
+    ``build_figure`` is called with ``max_points=None`` and ``max_points``;
+    returns a short human-readable summary.
+    """
+    lines = []
+    for label, budget in (("Full resolution", None), (f"LTTB {max_points} pts", max_points)):
+        started = time.perf_counter()
+        fig = build_figure(max_points=budget)
+        build_ms = (time.perf_counter() - started) * 1000
+        size, encode_ms = payload_stats(fig)
+        points = sum(len(trace.x) for trace in fig.data if trace.x is not None)
+        lines.append(
+            f"{label}: {points:,} points, {size / 1024:,.0f} KB, "
+            f"build {build_ms:.0f} ms + encode {encode_ms:.0f} ms"
+        )
+    return "  \n".join(lines)
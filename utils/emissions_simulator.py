@@ -0,0 +1,140 @@
+"""Monte Carlo pathways of Scope 1+2 emissions toward reduction targets.
+
+The reduction-rate model treats each year's log change in emissions as
+normal with unknown mean and variance, fitted to the reported history. Each
+simulated pathway first draws its own (mean, variance) from the posterior
+under a flat prior, then draws one rate per future year, so a short history
+widens the fan instead of looking precise. Pathways are generated as one
+``(n_paths, horizon)`` NumPy array.
+
+Results are cached by a hash of the inputs (history, horizon, path count,
+seed), in memory and as ``.npz`` files under ``.cache/emissions_sim``, so a
+revisit or a restart with the same data skips the simulation.
+"""
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SIM_CACHE_DIR = Path(__file__).resolve().parent.parent / '.cache' / 'emissions_sim'
+MODEL_VERSION = 1  # bump when the model changes so cached results are not reused
+DEFAULT_PATHS = 100_000
+
+
+@dataclass
+class ReductionModel:
+    mean: float  # mean annual log change (negative = reducing)
+    std: float
+    observations: int
+    last_year: int
+    last_value: float
+
+
+@dataclass
+class PathwaySimulation:
+    years: np.ndarray  # (T,) future years
+    paths: np.ndarray  # (n_paths, T) tCO2e
+    model: ReductionModel
+
+    def percentiles(self, q=(5, 25, 50, 75, 95)):
+        """(len(q), T) emissions percentiles per year"""
+        return np.percentile(self.paths, q, axis=0)
+
+    def probability_at_most(self, year, threshold):
+        """Share of pathways at or below ``threshold`` in ``year``"""
+        column = int(np.searchsorted(self.years, year))
+        if column >= len(self.years) or self.years[column] != year:
+            raise KeyError(f"{year} is outside the simulated years {self.years[0]}-{self.years[-1]}")
+        return float((self.paths[:, column] <= threshold).mean())
+
+
+def fit_reduction_model(history):
+    """Fit annual log-change statistics to a year-indexed emissions series"""
+    history = history.sort_index()
+    if len(history) < 3:
+        raise ValueError("at least three reported years are needed to fit a reduction rate")
+    years = history.index.to_numpy(dtype=float)
+    rates = np.diff(np.log(history.to_numpy(dtype=float))) / np.diff(years)
+    return ReductionModel(
+        mean=float(rates.mean()), std=float(rates.std(ddof=1)), observations=len(rates),
+        last_year=int(history.index[-1]), last_value=float(history.iloc[-1]),
+    )
+
+
+def simulate_pathways(model, end_year, n_paths=DEFAULT_PATHS, seed=0):
+    """Simulate ``n_paths`` emissions pathways from the model's last year to ``end_year``"""
+    rng = np.random.default_rng(seed)
+    years = np.arange(model.last_year + 1, end_year + 1)
+    n = model.observations
+    # Posterior draws of (variance, mean) per pathway, then one rate per pathway-year
+    variance = (n - 1) * model.std ** 2 / rng.chisquare(n - 1, size=(n_paths, 1))
+    mean = model.mean + np.sqrt(variance / n) * rng.standard_normal((n_paths, 1))
+    rates = mean + np.sqrt(variance) * rng.standard_normal((n_paths, len(years)))
+    paths = model.last_value * np.exp(np.cumsum(rates, axis=1))
+    return PathwaySimulation(years, paths.astype(np.float32), model)
+
+
+def input_hash(history, end_year, n_paths, seed):
+    payload = {
+        'model': MODEL_VERSION, 'end_year': int(end_year), 'n_paths': int(n_paths), 'seed': int(seed),
+        'history': [[int(year), float(value)] for year, value in history.sort_index().items()],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+def cached_simulation(history, end_year, n_paths=DEFAULT_PATHS, seed=0, cache_dir=SIM_CACHE_DIR):
+    """``simulate_pathways`` on ``history``, reusing any result with the same input hash"""
+    key = input_hash(history, end_year, n_paths, seed)
+    with _memo_lock:
+        if key in _memo:
+            return _memo[key]
+        model = fit_reduction_model(history)
+        path = Path(cache_dir) / f"{key}.npz"
+        if path.exists():
+            with np.load(path) as stored:
+                simulation = PathwaySimulation(stored['years'], stored['paths'], model)
+        else:
+            simulation = simulate_pathways(model, end_year, n_paths, seed)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix('.tmp.npz')
+            np.savez(tmp, years=simulation.years, paths=simulation.paths)
+            tmp.replace(path)
+        _memo[key] = simulation
+        return simulation
+
+
+def target_probabilities(history, targets, n_paths=DEFAULT_PATHS, seed=0):
+    """
+    Probability of meeting each ``emission_targets`` row, plus the simulation behind it
+
+    A target is met when Scope 1+2 in ``target_year`` is at most
+    ``(1 - reduction_pct/100)`` of the ``baseline_year`` figure. Targets whose
+    year is already reported are scored from the reported figure (0 or 1).
+    """
+    history = history.sort_index()
+    last_year = int(history.index[-1])
+    end_year = max([last_year + 1] + [int(y) for y in targets['target_year']])
+    simulation = cached_simulation(history, end_year, n_paths, seed)
+
+    rows = []
+    for target in targets.itertuples(index=False):
+        if target.baseline_year not in history.index:
+            raise KeyError(f"{target.goal}: no reported emissions for baseline year {target.baseline_year}")
+        threshold = history[target.baseline_year] * (1 - target.reduction_pct / 100)
+        if target.target_year <= last_year:
+            probability = float(history.get(target.target_year, np.inf) <= threshold)
+        else:
+            probability = simulation.probability_at_most(target.target_year, threshold)
+        rows.append({
+            'goal': target.goal, 'target_year': target.target_year,
+            'threshold_tco2e': threshold, 'probability': probability,
+        })
+    return pd.DataFrame(rows, columns=['goal', 'target_year', 'threshold_tco2e', 'probability']), simulation
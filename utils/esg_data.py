@@ -0,0 +1,285 @@
+"""Versioned, schema-validated ESG dataset.
+
+Inputs live in ``data/esg/<version>/`` as one CSV (or Parquet) file per
+table, in long format keyed by company (and year where relevant):
+
+- ``emissions``: Scope 1/2 tCO2e, Scope 2 basis, revenue (CAD B), connections (M)
+- ``renewables``: renewable electricity share; ``is_target`` marks goals
+- ``highlights``: headline figures for the Key Highlights tab
+- ``targets``, ``programs``, ``health``: goal progress and social reach
+- ``emission_targets``: the measurable Scope 1+2 cut behind a ``targets`` goal
+  (percent below the baseline year, by the target year)
+
+Every table is checked against ``SCHEMAS`` when loaded. Emission totals and
+intensities are computed once here, together with a peer-comparison cube
+(YoY deltas and within-year percentile ranks, see ``build_cube``); lookups
+go through (company, year) indexes instead of scanning frames. To restate published figures, copy the
+directory to a new version and point ``ESG_DATA_VERSION`` at it; to add a
+company, append its rows from its own disclosures.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+ESG_DATA_DIR = Path(__file__).resolve().parent.parent / 'data' / 'esg'
+ESG_DATA_VERSION = 'v1'
+
+
+class ESGDataError(ValueError):
+    """An ESG input file is missing or does not match its schema"""
+
+
+@dataclass(frozen=True)
+class Column:
+    dtype: str  # 'str', 'int', 'float' or 'bool'
+    min: float = None
+    max: float = None
+    choices: tuple = None
+
+
+SCHEMAS = {
+    'emissions': {
+        'key': ['company', 'year'],
+        'columns': {
+            'company': Column('str'),
+            'year': Column('int', 1990, 2100),
+            'scope1_tco2e': Column('float', 0),
+            'scope2_tco2e': Column('float', 0),
+            'scope2_basis': Column('str', choices=('market', 'location')),
+            'revenue_cad_b': Column('float', 0),
+            'connections_m': Column('float', 0),
+        },
+    },
+    'renewables': {
+        'key': ['company', 'year'],
+        'columns': {
+            'company': Column('str'),
+            'year': Column('int', 1990, 2100),
+            'renewable_pct': Column('float', 0, 100),
+            'is_target': Column('bool'),
+        },
+    },
+    'highlights': {
+        'key': ['company', 'year', 'category'],
+        'columns': {
+            'company': Column('str'),
+            'year': Column('int', 1990, 2100),
+            'category': Column('str'),
+            'value': Column('float'),
+            'display': Column('str'),
+            'description': Column('str'),
+        },
+    },
+    'targets': {
+        'key': ['company', 'goal'],
+        'columns': {
+            'company': Column('str'),
+            'goal': Column('str'),
+            'status': Column('str'),
+            'progress': Column('str'),
+        },
+    },
+    'emission_targets': {
+        'key': ['company', 'goal'],
+        'columns': {
+            'company': Column('str'),
+            'goal': Column('str'),
+            'baseline_year': Column('int', 1990, 2100),
+            'target_year': Column('int', 1990, 2100),
+            'reduction_pct': Column('float', 0, 100),
+        },
+    },
+    'programs': {
+        'key': ['company', 'program'],
+        'columns': {
+            'company': Column('str'),
+            'program': Column('str'),
+            'people_reached': Column('float', 0),
+        },
+    },
+    'health': {
+        'key': ['company', 'metric'],
+        'columns': {
+            'company': Column('str'),
+            'metric': Column('str'),
+            'value': Column('float', 0),
+        },
+    },
+}
+
+_BOOLS = {'true': True, 'false': False, '1': True, '0': False}
+
+
+def _coerce(name, column, values, spec):
+    """Cast one column to its schema type, raising ESGDataError on bad values"""
+    if values.isna().any():
+        raise ESGDataError(f"{name}.{column}: missing values in rows {list(values.index[values.isna()])}")
+    if spec.dtype == 'str':
+        return values.astype(str).str.strip()
+    if spec.dtype == 'bool':
+        if values.dtype == bool:
+            return values
+        mapped = values.astype(str).str.strip().str.lower().map(_BOOLS)
+        if mapped.isna().any():
+            raise ESGDataError(f"{name}.{column}: expected true/false, got {values[mapped.isna()].tolist()}")
+        return mapped.astype(bool)
+    numeric = pd.to_numeric(values, errors='coerce')
+    if numeric.isna().any():
+        raise ESGDataError(f"{name}.{column}: expected numbers, got {values[numeric.isna()].tolist()}")
+    if spec.dtype == 'int':
+        if (numeric % 1 != 0).any():
+            raise ESGDataError(f"{name}.{column}: expected whole numbers")
+        numeric = numeric.astype('int64')
+    else:
+        numeric = numeric.astype(float)
+    return numeric
+
+
+def validate(name, frame):
+    """Return ``frame`` cast to the ``name`` schema, or raise ESGDataError"""
+    schema = SCHEMAS[name]
+    missing = [c for c in schema['columns'] if c not in frame.columns]
+    if missing:
+        raise ESGDataError(f"{name}: missing columns {missing}")
+    frame = frame[list(schema['columns'])].copy()
+    for column, spec in schema['columns'].items():
+        values = _coerce(name, column, frame[column], spec)
+        if spec.min is not None and (values < spec.min).any():
+            raise ESGDataError(f"{name}.{column}: values below {spec.min}")
+        if spec.max is not None and (values > spec.max).any():
+            raise ESGDataError(f"{name}.{column}: values above {spec.max}")
+        if spec.choices is not None and not values.isin(spec.choices).all():
+            raise ESGDataError(f"{name}.{column}: values outside {list(spec.choices)}")
+        frame[column] = values
+    duplicated = frame.duplicated(schema['key'])
+    if duplicated.any():
+        rows = frame.loc[duplicated, schema['key']].values.tolist()
+        more = f" and {len(rows) - 5} more" if len(rows) > 5 else ""
+        raise ESGDataError(f"{name}: duplicate {schema['key']} rows {rows[:5]}{more}")
+    return frame.reset_index(drop=True)
+
+
+def read_table(name, version=ESG_DATA_VERSION, root=ESG_DATA_DIR):
+    """Read and validate one table, preferring Parquet over CSV"""
+    directory = Path(root) / version
+    parquet, csv = directory / f"{name}.parquet", directory / f"{name}.csv"
+    if parquet.exists():
+        frame = pd.read_parquet(parquet)
+    elif csv.exists():
+        frame = pd.read_csv(csv)
+    else:
+        raise ESGDataError(f"{name}: no {name}.parquet or {name}.csv in {directory}")
+    return validate(name, frame)
+
+
+def add_intensities(emissions):
+    """Scope 1+2 total and revenue/connection intensities, computed once at ingest"""
+    emissions = emissions.copy()
+    emissions['total_tco2e'] = emissions['scope1_tco2e'] + emissions['scope2_tco2e']
+    emissions['tCO2e_per_BCAD'] = emissions['total_tco2e'] / emissions['revenue_cad_b']
+    emissions['kgCO2e_per_connection'] = emissions['total_tco2e'] * 1000 / (emissions['connections_m'] * 1e6)
+    return emissions
+
+
+CUBE_METRICS = ['total_tco2e', 'tCO2e_per_BCAD', 'kgCO2e_per_connection']
+
+
+def build_cube(emissions):
+    """
+    Precompute every peer-comparison aggregate, indexed by (company, year)
+
+    For each metric in ``CUBE_METRICS``:
+    - ``<metric>_yoy`` / ``<metric>_yoy_pct``: change vs the company's previous reported year
+    - ``<metric>_pctile``: percentile rank among companies reporting that year
+      (0 = lowest value, i.e. cleanest; 100 = highest)
+    - ``<metric>_rank``: 1 = lowest value that year
+    """
+    cube = emissions.set_index(['company', 'year']).sort_index()[CUBE_METRICS].copy()
+    by_company = cube.groupby(level='company')
+    by_year = cube.groupby(level='year')
+    for metric in CUBE_METRICS:
+        previous = by_company[metric].shift()
+        cube[f"{metric}_yoy"] = cube[metric] - previous
+        cube[f"{metric}_yoy_pct"] = (cube[metric] / previous - 1) * 100
+        counts = by_year[metric].transform('count')
+        rank = by_year[metric].rank(method='min')
+        cube[f"{metric}_rank"] = rank.astype(int)
+        cube[f"{metric}_pctile"] = ((rank - 1) / (counts - 1).where(counts > 1) * 100).fillna(0.0)
+    cube['peers'] = by_year[CUBE_METRICS[0]].transform('count')
+    return cube
+
+
+class ESGDataset:
+    """Validated ESG tables with (company, year)-indexed lookups"""
+
+    def __init__(self, tables, version=ESG_DATA_VERSION):
+        self.version = version
+        emissions = add_intensities(tables['emissions'])
+        self.emissions = emissions.set_index(['company', 'year']).sort_index()
+        self.renewables = tables['renewables'].set_index(['company', 'year']).sort_index()
+        self.cube = build_cube(emissions)
+        # Slices the comparison view asks for, materialised once at ingest
+        self._cross_sections = {year: rows.droplevel('year') for year, rows in self.cube.groupby(level='year')}
+        self._trends = {metric: self.cube[metric].unstack('company') for metric in CUBE_METRICS}
+        # Row order of these tables is display order, so they are split rather than sorted
+        self._highlights = {
+            key: rows.drop(columns=['company', 'year']).set_index('category')
+            for key, rows in tables['highlights'].groupby(['company', 'year'], sort=False)
+        }
+        self._by_company = {
+            name: {company: rows.drop(columns='company').reset_index(drop=True)
+                   for company, rows in tables[name].groupby('company', sort=False)}
+            for name in ('targets', 'emission_targets', 'programs', 'health')
+        }
+        self._columns = {name: [c for c in SCHEMAS[name]['columns'] if c != 'company']
+                         for name in self._by_company}
+
+    @classmethod
+    def load(cls, version=ESG_DATA_VERSION, root=ESG_DATA_DIR):
+        return cls({name: read_table(name, version, root) for name in SCHEMAS}, version)
+
+    def companies(self):
+        return list(self.emissions.index.unique('company'))
+
+    def years(self, company):
+        return list(self.emissions.loc[company].index)
+
+    def emissions_for(self, company):
+        """Year-indexed emissions and intensities of one company"""
+        return self.emissions.loc[company]
+
+    def emissions_at(self, company, year):
+        """One company-year row; KeyError if it is not reported"""
+        return self.emissions.loc[(company, year)]
+
+    def cube_years(self):
+        return list(self._cross_sections)
+
+    def cross_section(self, year):
+        """Company-indexed cube rows for one year (every metric, delta and rank)"""
+        return self._cross_sections[year]
+
+    def trend(self, metric):
+        """Year x company frame of one cube metric"""
+        return self._trends[metric]
+
+    def renewables_for(self, company):
+        return self.renewables.loc[company]
+
+    def highlight_years(self, company):
+        return sorted(year for c, year in self._highlights if c == company)
+
+    def highlights_for(self, company, year):
+        """Category-indexed headline figures for one company-year; KeyError if none"""
+        return self._highlights[(company, year)]
+
+    def table(self, name, company):
+        """``targets``, ``emission_targets``, ``programs`` or ``health`` rows of one company (empty if none)"""
+        rows = self._by_company[name].get(company)
+        return rows if rows is not None else pd.DataFrame(columns=self._columns[name])
+
+
+def load_esg_dataset(version=ESG_DATA_VERSION, root=ESG_DATA_DIR):
+    """Load and validate every table of one dataset version"""
+    return ESGDataset.load(version, root)
@@ -0,0 +1,25 @@
+"""ESG event-study settings shared by the ESG stock page and its refresh job.
+
+The benchmark, peer group, event dates and default study windows are page
+data; ``utils.prefetch`` imports them from here so the background job and
+the page always study the same events against the same benchmark.
+"""
+BENCHMARK = "^GSPTSE"  # S&P/TSX Composite
+ESTIMATION_GAP = 10  # trading days between estimation and event windows
+PEER_TICKERS = ["BCE.TO", "RCI-B.TO", "QBR-B.TO", "CCA.TO"]  # Canadian telecom peers
+DEFAULT_ESTIMATION_DAYS = 120
+DEFAULT_EVENT_HALF_WIDTH = 1
+
+# ESG Events Data - Using verified annual ESG reporting dates (beginning of month)
+ESG_EVENTS = [
+    {'name': '2024 ESG Data Sheet Release', 'date': '2025-05-01', 'color': 'green'},
+    {'name': 'S&P Global ESG Score Update', 'date': '2025-09-01', 'color': 'blue'},
+    {'name': '2023 ESG Data Sheet Release', 'date': '2024-05-01', 'color': 'green'},
+    {'name': 'S&P Global ESG Score Update', 'date': '2024-09-01', 'color': 'blue'},
+    {'name': '2022 ESG Data Sheet Release', 'date': '2023-05-01', 'color': 'green'}
+]
+
+
+def study_windows(estimation_days, event_half_width):
+    """Market-model estimation and event windows relative to each event"""
+    return (-(estimation_days + ESTIMATION_GAP), -(ESTIMATION_GAP + 1)), (-event_half_width, event_half_width)
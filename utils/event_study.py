@@ -0,0 +1,235 @@
+"""Vectorised event-study calculations.
+
+``batch_event_impact`` evaluates any number of events against one price
+history in a single pass: returns and rolling volatility are computed once,
+and every event is mapped to its nearest trading day with one
+``searchsorted`` call. ``market_model_event_study`` adds benchmark-adjusted
+abnormal returns (CAR/BHAR with t-stats) from per-event market-model fits.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _as_index_dates(event_dates, index):
+    """Convert event dates to datetime64 values comparable with ``index``"""
+    dates = pd.DatetimeIndex(pd.to_datetime(list(event_dates)))
+    if index.tz is not None:
+        if dates.tz is None:
+            dates = dates.tz_localize(index.tz, ambiguous=np.zeros(len(dates), dtype=bool),
+                                      nonexistent='shift_forward')
+        else:
+            dates = dates.tz_convert(index.tz)
+    elif dates.tz is not None:
+        dates = dates.tz_localize(None)
+    return dates
+
+
+def nearest_trading_positions(index, event_dates):
+    """Positions in ``index`` of the trading day nearest each event date"""
+    dates = _as_index_dates(event_dates, index)
+    values = index.asi8
+    targets = dates.asi8
+    right = np.searchsorted(values, targets).clip(1, len(values) - 1)
+    left = right - 1
+    take_left = (targets - values[left]) <= (values[right] - targets)
+    positions = np.where(take_left, left, right)
+    # A single-row index has no right neighbour to compare against
+    if len(values) == 1:
+        positions[:] = 0
+    return positions, dates
+
+
+def batch_event_impact(stock_data, event_dates, vol_window=30):
+    """
+    Calculate the stock impact around many events at once
+
+    Parameters:
+    - stock_data: DataFrame with a sorted DatetimeIndex and a 'Close' column
+    - event_dates: iterable of event dates
+    - vol_window: trading days used for the normal-volatility estimate
+
+    Returns:
+    - DataFrame with one row per event: trading_date, price_before, event_price,
+      price_after, two_day_return, normal_volatility, impact and attribution
+      ('full' when the move beats normal volatility, 'partial' otherwise,
+      None when the event has no neighbouring trading days)
+    """
+    close = stock_data['Close'].to_numpy(dtype=float)
+    n = len(close)
+    event_dates = list(event_dates)
+    if n == 0:
+        return pd.DataFrame({
+            'event_date': pd.to_datetime(event_dates),
+            'impact': 0.0,
+            'attribution': None,
+        })
+
+    positions, dates = nearest_trading_positions(stock_data.index, event_dates)
+
+    returns = stock_data['Close'].pct_change()
+    volatility = returns.rolling(vol_window).std().to_numpy() * 100
+
+    valid = (positions >= 1) & (positions < n - 1)
+    before = close[np.clip(positions - 1, 0, n - 1)]
+    after = close[np.clip(positions + 1, 0, n - 1)]
+    two_day_return = (after - before) / before * 100
+    normal_volatility = volatility[positions]
+
+    # Moves larger than normal volatility are fully attributed to the event,
+    # anything smaller is treated as partly market noise
+    full = np.abs(two_day_return) > normal_volatility
+    impact = np.where(full, two_day_return, two_day_return * 0.5)
+
+    result = pd.DataFrame({
+        'event_date': dates,
+        'trading_date': stock_data.index[positions],
+        'price_before': before,
+        'event_price': close[positions],
+        'price_after': after,
+        'two_day_return': two_day_return,
+        'normal_volatility': normal_volatility,
+        'impact': np.where(valid, impact, 0.0),
+        'attribution': np.where(full, 'full', 'partial').astype(object),
+    })
+    result.loc[~valid, ['price_before', 'price_after', 'two_day_return', 'normal_volatility']] = np.nan
+    result.loc[~valid, 'attribution'] = None
+    return result
+
+
+STAT_COLUMNS = ['alpha', 'beta', 'sigma', 'car', 'bhar', 'car_t']
+
+
+def _window_matrix(positions, offsets):
+    """Row-per-event matrix of positions ``p + offset``"""
+    return positions[:, None] + np.asarray(offsets)[None, :]
+
+
+def _market_model(stock_ret, market_ret, positions, estimation_window, event_window):
+    """
+    Stacked market-model fits for a (days x series) return matrix
+
+    Every (event, series) pair is one OLS regression; all of them are solved
+    together in closed form on (events x days x series) arrays. Returns a dict
+    of (events x series) arrays plus the (events x series) ``valid`` mask: a
+    pair is valid when both windows lie inside the data and neither the
+    series nor the benchmark has a missing return in them.
+    """
+    n = len(market_ret)
+    est = _window_matrix(positions, np.arange(estimation_window[0], estimation_window[1] + 1))
+    evt = _window_matrix(positions, np.arange(event_window[0], event_window[1] + 1))
+    # Returns start at position 1; every window must lie fully inside the data
+    in_range = (est.min(axis=1) >= 1) & (evt.min(axis=1) >= 1) & (evt.max(axis=1) < n)
+    est = est.clip(1, n - 1)
+    evt = evt.clip(1, n - 1)
+    windows = np.concatenate([est, evt], axis=1)
+    complete = ~np.isnan(stock_ret[windows]).any(axis=1) & ~np.isnan(market_ret[windows]).any(axis=1)[:, None]
+    valid = in_range[:, None] & complete
+
+    r_est, m_est = stock_ret[est], market_ret[est][:, :, None]
+    m_mean = m_est.mean(axis=1, keepdims=True)
+    r_mean = r_est.mean(axis=1, keepdims=True)
+    m_dev = m_est - m_mean
+    beta = (m_dev * (r_est - r_mean)).sum(axis=1) / (m_dev ** 2).sum(axis=1)
+    alpha = r_mean[:, 0] - beta * m_mean[:, 0]
+    resid = r_est - (alpha[:, None] + beta[:, None] * m_est)
+    dof = est.shape[1] - 2
+    sigma = np.sqrt((resid ** 2).sum(axis=1) / dof)
+
+    r_evt, m_evt = stock_ret[evt], market_ret[evt][:, :, None]
+    normal = alpha[:, None] + beta[:, None] * m_evt
+    car = (r_evt - normal).sum(axis=1)
+    bhar = np.prod(1 + r_evt, axis=1) - np.prod(1 + normal, axis=1)
+    car_t = car / (sigma * np.sqrt(evt.shape[1]))
+    return {
+        'alpha': alpha, 'beta': beta, 'sigma': sigma,
+        'car': car * 100, 'bhar': bhar * 100, 'car_t': car_t,
+    }, valid
+
+
+def _aligned_returns(stock_prices, benchmark_close):
+    """
+    Join prices with the benchmark and return (index, stock returns, market returns)
+
+    Each column's returns come from its own prices: gaps inside a series are
+    forward-filled, but dates before a series starts stay NaN rather than
+    being dropped for every other series.
+    """
+    prices = pd.concat([stock_prices, benchmark_close.rename('__benchmark__')], axis=1, join='inner')
+    prices = prices.sort_index().ffill().dropna(subset=['__benchmark__'])
+    values = prices.to_numpy(dtype=float)
+    returns = np.full_like(values, np.nan)
+    returns[1:] = values[1:] / values[:-1] - 1
+    return prices.index, returns[:, :-1], returns[:, -1]
+
+
+def market_model_event_study(stock_close, benchmark_close, event_dates,
+                             estimation_window=(-130, -11), event_window=(-1, 1)):
+    """
+    Market-model event study for many events at once
+
+    For each event an OLS market model ``r = alpha + beta * r_m`` is fitted over
+    the estimation window, and abnormal returns are accumulated over the event
+    window.
+
+    Parameters:
+    - stock_close, benchmark_close: Close price Series with DatetimeIndex
+    - event_dates: iterable of event dates
+    - estimation_window: (first, last) trading-day offsets relative to the event
+    - event_window: (first, last) trading-day offsets relative to the event
+
+    Returns:
+    - DataFrame with one row per event: trading_date, alpha, beta, sigma,
+      car and bhar (in %), car_t and significant (|t| > 1.96). Rows without
+      enough data around the event have valid=False and NaN statistics.
+    """
+    result = panel_event_study(stock_close.to_frame('stock'), benchmark_close, event_dates,
+                               estimation_window, event_window)
+    if 'ticker' in result:
+        result = result.drop(columns='ticker')
+    return result.reset_index(drop=True)
+
+
+def panel_event_study(panel, benchmark_close, event_dates,
+                      estimation_window=(-130, -11), event_window=(-1, 1)):
+    """
+    Market-model event study for every column of a wide price panel at once
+
+    Parameters:
+    - panel: DataFrame of Close prices, one column per ticker
+    - benchmark_close, event_dates, estimation_window, event_window:
+      as for ``market_model_event_study``
+
+    Returns:
+    - Long DataFrame with one row per (ticker, event) and the same statistics
+      as ``market_model_event_study``
+    """
+    index, stock_ret, market_ret = _aligned_returns(panel, benchmark_close)
+    event_dates = list(event_dates)
+    if len(index) < 2:
+        # Too little overlap to fit anything: every (ticker, event) row is invalid
+        n_events, n_series = len(event_dates), panel.shape[1]
+        return pd.DataFrame({
+            'ticker': np.tile(np.asarray(panel.columns, dtype=object), n_events),
+            'event_date': np.repeat(pd.to_datetime(event_dates), n_series),
+            'trading_date': pd.NaT,
+            **{name: np.nan for name in STAT_COLUMNS},
+            'valid': False,
+            'significant': False,
+        }, index=pd.RangeIndex(n_events * n_series))
+
+    positions, dates = nearest_trading_positions(index, event_dates)
+    stats, valid = _market_model(stock_ret, market_ret, positions, estimation_window, event_window)
+
+    n_events, n_series = len(positions), stock_ret.shape[1]
+    result = pd.DataFrame({
+        'ticker': np.tile(np.asarray(panel.columns, dtype=object), n_events),
+        'event_date': np.repeat(dates, n_series),
+        'trading_date': np.repeat(index[positions], n_series),
+        **{name: values.ravel() for name, values in stats.items()},
+        'valid': valid.ravel(),
+    })
+    result['significant'] = np.abs(result['car_t']) > 1.96
+    invalid = ~result['valid']
+    result.loc[invalid, list(stats)] = np.nan
+    result.loc[invalid, 'significant'] = False
+    return result
@@ -0,0 +1,67 @@
+"""Process-wide cache of built Plotly figures.
+
+Figures are keyed on a cheap fingerprint of their inputs (frames, event
+lists, settings), so a rerun caused by an unrelated widget reuses the figure
+built on an earlier run instead of rebuilding traces, markers and shapes.
+
+Cached figures are shared between sessions: callers must not mutate them.
+"""
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from utils.market_windows import CacheStats
+
+DEFAULT_MAX_FIGURES = 32
+
+
+def fingerprint(*parts):
+    """Stable hash of frames, series and plain Python values"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series, pd.Index)):
+            digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+            names = part.columns if isinstance(part, pd.DataFrame) else [part.name]
+            digest.update(repr(list(names)).encode())
+        else:
+            digest.update(pickle.dumps(part, protocol=4))
+        digest.update(b'|')
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """LRU cache of built figures keyed by (chart name, input fingerprint)"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_FIGURES, stats=None):
+        self.max_entries = max_entries
+        self.stats = stats if stats is not None else CacheStats()
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, name, key_parts, build):
+        """Return the cached figure for ``key_parts`` or call ``build()`` once"""
+        key = (name, fingerprint(*key_parts))
+        self.stats.request(name)
+        with self._lock:
+            fig = self._figures.get(key)
+            if fig is not None:
+                self._figures.move_to_end(key)
+                return fig
+        self.stats.miss(name)
+        fig = build()
+        with self._lock:
+            self._figures[key] = fig
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return fig
+
+
+figure_cache = FigureCache()
+
+
+def cached_figure(name, key_parts, build):
+    """Shortcut for ``figure_cache.get_or_build``"""
+    return figure_cache.get_or_build(name, key_parts, build)
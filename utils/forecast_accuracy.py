@@ -0,0 +1,219 @@
+"""Realized accuracy of stored forecast vintages.
+
+Every forecast vintage in the live forecast store (batch runs and live
+refits) is scored against the closes that arrived after it. A scored cell is
+one (model, vintage, ds) with its horizon ``step`` — trading days after the
+vintage's first forecast date — the forecast, the realized close and the
+errors.
+
+Scoring is incremental: each vintage keeps a watermark (the last close it
+was scored through), and ``AccuracyTracker.update`` only reads vintages that
+have unscored dates up to the latest final close and scores just those new
+cells. The current session's close is provisional, so it is never scored.
+New cells are appended as a small Parquet part; fragments are merged once
+they pile up. Watermarks live in a small ``watermarks.json`` sidecar, so an
+update does not read the scores themselves.
+"""
+import json
+import logging
+import threading
+from pathlib import Path
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from utils.forecast_store import live_forecast_store
+from utils.market_windows import last_final_day
+
+logger = logging.getLogger(__name__)
+
+ACCURACY_DIR = Path(__file__).resolve().parent.parent / '.cache' / 'accuracy'
+COMPACT_AFTER = 20  # score fragments per ticker before they are merged
+WATERMARKS = 'watermarks.json'
+WATERMARK_COLUMNS = ['model', 'vintage', 'scored_through', 'horizon_end']
+SCORE_COLUMNS = [
+    'model', 'vintage', 'ds', 'step', 'horizon_end', 'scored_through', 'yhat', 'y', 'abs_error', 'ape'
+]
+
+
+def _normalized_closes(closes):
+    index = pd.DatetimeIndex(closes.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    closes = pd.Series(closes.to_numpy(dtype=float), index=index.normalize())
+    return closes[~closes.index.duplicated(keep='last')].sort_index()
+
+
+def score_cells(forecast, closes, after=None):
+    """
+    Score one vintage's rows dated after ``after`` against ``closes``
+
+    ``forecast`` holds every row of the vintage so that steps are counted
+    from its first forecast date. Dates without a close (weekends, holidays,
+    the future) are left unscored.
+    """
+    forecast = forecast.sort_values('ds')
+    first = forecast['ds'].iloc[0]
+    rows = forecast[forecast['ds'] <= closes.index[-1]]
+    if after is not None:
+        rows = rows[rows['ds'] > after]
+    rows = rows[rows['ds'].isin(closes.index)]
+    if rows.empty:
+        return pd.DataFrame(columns=SCORE_COLUMNS)
+
+    y = closes.reindex(rows['ds']).to_numpy()
+    index = closes.index
+    step = index.searchsorted(rows['ds'], side='right') - index.searchsorted(first, side='left')
+    yhat = rows['yhat'].to_numpy()
+    abs_error = np.abs(y - yhat)
+    return pd.DataFrame({
+        'model': rows['model'].to_numpy(),
+        'vintage': rows['vintage'].to_numpy(),
+        'ds': rows['ds'].to_numpy(),
+        'step': step,
+        'horizon_end': forecast['ds'].iloc[-1],
+        'scored_through': closes.index[-1],
+        'yhat': yhat,
+        'y': y,
+        'abs_error': abs_error,
+        'ape': abs_error / np.abs(y) * 100,
+    })
+
+
+class AccuracyTracker:
+    """Incrementally scored forecast cells, one Parquet directory per ticker"""
+
+    def __init__(self, store=None, root=ACCURACY_DIR):
+        self.store = store if store is not None else live_forecast_store()
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def _dir(self, ticker):
+        return self.root / quote(ticker, safe='')
+
+    def _fragments(self, ticker):
+        return sorted(self._dir(ticker).glob('*.parquet'))
+
+    def scores(self, ticker):
+        """Every scored cell of ``ticker``"""
+        parts = self._fragments(ticker)
+        if not parts:
+            return pd.DataFrame(columns=SCORE_COLUMNS)
+        return pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+
+    @staticmethod
+    def _watermarks(scores):
+        if scores.empty:
+            return {}
+        marks = scores.groupby(['model', 'vintage']).agg(
+            scored_through=('scored_through', 'max'), horizon_end=('horizon_end', 'max'))
+        return {key: (row.scored_through, row.horizon_end) for key, row in marks.iterrows()}
+
+    def _load_watermarks(self, ticker):
+        """
+        ``{(model, vintage): (scored_through, horizon_end)}`` from the sidecar
+
+        The sidecar records which fragments it reflects; if they differ (a
+        crash between writing a part and the sidecar), the marks are rebuilt
+        from the watermark columns alone.
+        """
+        fragments = self._fragments(ticker)
+        path = self._dir(ticker) / WATERMARKS
+        if path.exists():
+            saved = json.loads(path.read_text())
+            if saved['fragments'] == [p.name for p in fragments]:
+                return {(model, pd.Timestamp(vintage)): (pd.Timestamp(through), pd.Timestamp(end))
+                        for model, vintage, through, end in saved['marks']}
+        if not fragments:
+            return {}
+        columns = pd.concat([pd.read_parquet(p, columns=WATERMARK_COLUMNS) for p in fragments], ignore_index=True)
+        marks = self._watermarks(columns)
+        self._save_watermarks(ticker, marks)
+        return marks
+
+    def _save_watermarks(self, ticker, marks):
+        directory = self._dir(ticker)
+        payload = {
+            'fragments': [p.name for p in self._fragments(ticker)],
+            'marks': [[model, vintage.isoformat(), through.isoformat(), end.isoformat()]
+                      for (model, vintage), (through, end) in marks.items()],
+        }
+        tmp = directory / f".{WATERMARKS}.tmp"
+        tmp.write_text(json.dumps(payload))
+        tmp.replace(directory / WATERMARKS)
+
+    def update(self, ticker, closes, final_through=None):
+        """
+        Score cells that became realized since the last update
+
+        Only closes up to ``final_through`` (default: the last final day) are
+        used; the current session's close can still change. Returns the
+        number of newly scored cells.
+        """
+        final_through = last_final_day() if final_through is None else pd.Timestamp(final_through)
+        closes = _normalized_closes(closes.dropna())
+        closes = closes[closes.index <= final_through]
+        if closes.empty:
+            return 0
+        last_close = closes.index[-1]
+        with self._lock:
+            marks = self._load_watermarks(ticker)
+            new_cells = []
+            for row in self.store.vintages(ticker).itertuples(index=False):
+                after, horizon_end = marks.get((row.model, row.vintage), (None, None))
+                if after is not None and (after >= last_close or after >= horizon_end):
+                    continue  # nothing new to score for this vintage
+                forecast = self.store.read(ticker, row.model, row.vintage)
+                cells = score_cells(forecast, closes, after)
+                if not cells.empty:
+                    new_cells.append(cells)
+            if not new_cells:
+                return 0
+            cells = pd.concat(new_cells, ignore_index=True)
+            self._append(ticker, cells)
+            marks.update(self._watermarks(cells[WATERMARK_COLUMNS]))
+            self._save_watermarks(ticker, marks)
+            logger.info("Scored %d new forecast cells for %s", len(cells), ticker)
+            return len(cells)
+
+    def _append(self, ticker, cells):
+        directory = self._dir(ticker)
+        directory.mkdir(parents=True, exist_ok=True)
+        part = directory / f"part-{pd.Timestamp.now():%Y%m%dT%H%M%S%f}.parquet"
+        tmp = part.with_suffix('.tmp')
+        cells[SCORE_COLUMNS].to_parquet(tmp, index=False)
+        tmp.replace(part)
+
+        # Merge every fragment, earlier compactions included, into one file
+        fragments = self._fragments(ticker)
+        if len(fragments) > COMPACT_AFTER:
+            merged = pd.concat([pd.read_parquet(p) for p in fragments], ignore_index=True)
+            target = directory / f"compacted-{pd.Timestamp.now():%Y%m%dT%H%M%S%f}.parquet"
+            tmp = target.with_suffix('.tmp')
+            merged.to_parquet(tmp, index=False)
+            tmp.replace(target)
+            for p in fragments:
+                p.unlink()
+
+
+def decay_curve(scores):
+    """Per-model MAE, MAPE and vintage count by horizon step"""
+    if scores.empty:
+        return pd.DataFrame(columns=['model', 'step', 'mae', 'mape', 'vintages'])
+    return (
+        scores.groupby(['model', 'step'], as_index=False)
+        .agg(mae=('abs_error', 'mean'), mape=('ape', 'mean'), vintages=('vintage', 'nunique'))
+    )
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_accuracy_tracker():
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = AccuracyTracker()
+        return _tracker
@@ -0,0 +1,221 @@
+"""Partitioned Parquet dataset of batch forecasts.
+
+Forecasts are kept in long format — one row per (ticker, model, vintage, ds)
+with the point forecast and interval bounds. On disk the dataset is
+hive-partitioned by ticker and model, with one file per forecast vintage::
+
+    data/forecasts/ticker=T.TO/model=AutoARIMA/20250912T000000.parquet
+
+Vintages are immutable: a run always adds a new file and never rewrites an
+earlier one, so past forecasts stay available for scoring against the
+prices that followed (see ``utils.forecast_accuracy``). Batch runs write to
+the tracked ``data/forecasts``; the live app archives its refits under the
+gitignored ``.cache/forecasts`` (``live_forecast_store``), and readers of the
+live store see both. Vintages are stamped in market (Toronto) time, like
+``ds``.
+
+Reads go through ``pyarrow.dataset`` over the committed ``*.parquet`` files
+(writes land in a hidden temporary file first): ticker and model filters
+prune whole directories and vintage filters are checked against Parquet
+statistics, so showing one series never scans the rest of the dataset. ``to_wide`` turns a
+model's rows back into the ``ds, <model>, <model>-lo-80, ...`` layout the
+forecasting page plots.
+"""
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+FORECAST_DIR = Path(__file__).resolve().parent.parent / 'data' / 'forecasts'
+LIVE_FORECAST_DIR = Path(__file__).resolve().parent.parent / '.cache' / 'forecasts'
+LEVELS = [80, 95]
+INTERVAL_COLUMNS = [f"{side}_{level}" for level in LEVELS for side in ('lo', 'hi')]
+COLUMNS = ['ticker', 'model', 'vintage', 'ds', 'yhat'] + INTERVAL_COLUMNS
+
+PARTITIONING = ds.partitioning(pa.schema([('ticker', pa.string()), ('model', pa.string())]), flavor='hive')
+# Schema of the files themselves; ticker and model live in the directory names
+FILE_SCHEMA = pa.schema(
+    [('vintage', pa.timestamp('us')), ('ds', pa.timestamp('us')), ('yhat', pa.float64())]
+    + [(column, pa.float64()) for column in INTERVAL_COLUMNS]
+)
+SCHEMA = pa.schema([('ticker', pa.string()), ('model', pa.string())] + list(FILE_SCHEMA))
+
+
+def _empty():
+    return SCHEMA.empty_table().to_pandas()
+
+
+def from_statsforecast(forecasts, models, vintage):
+    """Convert a wide ``StatsForecast.forecast`` frame to the store's long layout"""
+    forecasts = forecasts.reset_index() if 'unique_id' not in forecasts else forecasts
+    frames = []
+    for model in models:
+        frame = pd.DataFrame({
+            'ticker': forecasts['unique_id'].astype(str),
+            'model': model,
+            'vintage': pd.Timestamp(vintage),
+            'ds': pd.to_datetime(forecasts['ds']),
+            'yhat': forecasts[model].astype(float),
+        })
+        for level in LEVELS:
+            for side in ('lo', 'hi'):
+                column = f"{model}-{side}-{level}"
+                frame[f"{side}_{level}"] = forecasts[column].astype(float) if column in forecasts else float('nan')
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)[COLUMNS]
+
+
+def to_wide(forecasts, model):
+    """``ds, <model>, <model>-lo-80, ...`` frame for one model"""
+    rows = forecasts[forecasts['model'] == model].sort_values('ds')
+    wide = pd.DataFrame({'ds': rows['ds'].to_numpy(), model: rows['yhat'].to_numpy()})
+    for level in LEVELS:
+        for side in ('lo', 'hi'):
+            values = rows[f"{side}_{level}"].to_numpy()
+            if not pd.isna(values).all():
+                wide[f"{model}-{side}-{level}"] = values
+    return wide
+
+
+class ForecastStore:
+    """
+    Hive-partitioned (ticker, model) Parquet dataset with one file per vintage
+
+    Writes go to ``root``; reads also cover any ``also_read`` roots laid out
+    the same way.
+    """
+
+    def __init__(self, root=FORECAST_DIR, also_read=()):
+        self.root = Path(root)
+        self.roots = [self.root] + [Path(r) for r in also_read]
+
+    def path(self, ticker, model, vintage):
+        return (self.root / f"ticker={quote(ticker, safe='')}" / f"model={quote(model, safe='')}"
+                / f"{pd.Timestamp(vintage):%Y%m%dT%H%M%S}.parquet")
+
+    def write(self, forecasts):
+        """
+        Append every (ticker, model, vintage) group of ``forecasts`` as a new file
+
+        Raises FileExistsError if a vintage is already stored; nothing is
+        written in that case.
+        """
+        groups = list(forecasts.groupby(['ticker', 'model', 'vintage']))
+        for (ticker, model, vintage), _ in groups:
+            if self.path(ticker, model, vintage).exists():
+                raise FileExistsError(f"Forecast vintage {vintage} of {ticker}/{model} is already stored")
+        for (ticker, model, vintage), group in groups:
+            path = self.path(ticker, model, vintage)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pandas(group[FILE_SCHEMA.names], schema=FILE_SCHEMA, preserve_index=False)
+            # Hidden and not *.parquet, so a concurrent or crashed write is never read
+            tmp = path.with_name(f".{path.name}.tmp")
+            pq.write_table(table, tmp, compression='zstd')
+            tmp.replace(path)
+
+    @staticmethod
+    def _files(root):
+        return sorted(root.glob('ticker=*/model=*/[!.]*.parquet'))
+
+    def files(self):
+        """Committed vintage files of every root; in-progress temporary files are excluded"""
+        return [f for root in self.roots for f in self._files(root)]
+
+    def _dataset(self):
+        parts = [
+            ds.dataset([str(f) for f in files], format='parquet', schema=SCHEMA,
+                       partitioning=PARTITIONING, partition_base_dir=str(root))
+            for root in self.roots
+            for files in [self._files(root)] if files
+        ]
+        if not parts:
+            return None
+        return parts[0] if len(parts) == 1 else ds.dataset(parts)
+
+    @staticmethod
+    def _filter(ticker=None, model=None, vintage=None):
+        expression = None
+        for field, value in (('ticker', ticker), ('model', model), ('vintage', vintage)):
+            if value is None:
+                continue
+            if field == 'vintage':
+                value = pa.scalar(pd.Timestamp(value).to_pydatetime(), type=pa.timestamp('us'))
+            term = ds.field(field) == value
+            expression = term if expression is None else expression & term
+        return expression
+
+    def vintages(self, ticker=None, model=None):
+        """Distinct ``ticker, model, vintage`` rows, reading only the vintage column"""
+        dataset = self._dataset()
+        if dataset is None:
+            return pd.DataFrame(columns=['ticker', 'model', 'vintage'])
+        table = dataset.to_table(columns=['ticker', 'model', 'vintage'], filter=self._filter(ticker, model))
+        return (
+            table.group_by(['ticker', 'model', 'vintage']).aggregate([]).to_pandas()
+            .sort_values(['ticker', 'model', 'vintage'], ignore_index=True)
+        )
+
+    def read(self, ticker, model=None, vintage='latest'):
+        """
+        Stored forecasts for ``ticker``; empty if none
+
+        ``vintage`` is ``'latest'`` (newest vintage of each model), ``None``
+        (every vintage) or a timestamp selecting one vintage.
+        """
+        dataset = self._dataset()
+        if dataset is None:
+            return _empty()
+        if vintage != 'latest':
+            expression = self._filter(ticker, model, vintage)
+        else:
+            latest = self.vintages(ticker, model).groupby('model')['vintage'].max()
+            if latest.empty:
+                return _empty()
+            expression = None
+            for name, newest in latest.items():
+                term = self._filter(ticker, name, newest)
+                expression = term if expression is None else expression | term
+        table = dataset.to_table(filter=expression)
+        table = table.take(pc.sort_indices(table, [('model', 'ascending'), ('vintage', 'ascending'),
+                                                   ('ds', 'ascending')]))
+        return table.select(COLUMNS).to_pandas()
+
+    def tickers(self):
+        return sorted({unquote(p.name.split('=', 1)[1])
+                       for root in self.roots for p in root.glob('ticker=*') if p.is_dir()})
+
+
+def live_forecast_store():
+    """Store the live app archives refits to, reading batch forecasts as well"""
+    return ForecastStore(LIVE_FORECAST_DIR, also_read=(FORECAST_DIR,))
+
+
+def migrate_csv(path, store=None, ticker=None, vintage=None):
+    """
+    One-off import of a legacy ``unique_id, ds, <model>`` forecast CSV
+
+    The tz-offset ``ds`` strings are converted to naive Toronto dates. They
+    were generated as fixed 24h steps, so after a DST change a day is written
+    as 23:00 the evening before; rounding to the nearest day (rather than
+    truncating) keeps every date on its own day. The CSV does not record when
+    it was produced, so the vintage defaults to the day before its first
+    forecast date.
+    """
+    store = store if store is not None else ForecastStore()
+    legacy = pd.read_csv(path, index_col=0)
+    ds_col = pd.to_datetime(legacy['ds'], utc=True).dt.tz_convert('America/Toronto').dt.tz_localize(None)
+    legacy = legacy.assign(ds=ds_col.dt.round('D'))
+    if ticker is not None:
+        legacy['unique_id'] = ticker
+    duplicated = legacy.duplicated(['unique_id', 'ds'])
+    if duplicated.any():
+        raise ValueError(f"{path}: several rows for ds {sorted(legacy.loc[duplicated, 'ds'].dt.date.unique())}")
+    models = [c for c in legacy.columns if c not in ('unique_id', 'ds') and '-lo-' not in c and '-hi-' not in c]
+    vintage = pd.Timestamp(vintage) if vintage is not None else legacy['ds'].min() - pd.Timedelta(days=1)
+    forecasts = from_statsforecast(legacy, models, vintage)
+    store.write(forecasts)
+    return forecasts
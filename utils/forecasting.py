@@ -0,0 +1,423 @@
+"""AutoARIMA price forecasting fitted on the shared price history.
+
+``fit_forecast`` fits statsforecast's AutoARIMA on daily closes, scores it on
+a hold-out tail and forecasts ``FORECAST_HORIZON`` trading days ahead. Fitted
+models are pickled under ``.cache/models`` together with the last bar they saw,
+so they are reused across restarts and refitted only when new bars arrive.
+
+When only a few new bars have arrived, ``refresh_forecast`` reuses the
+persisted model's order and coefficients (statsforecast ``forward``) instead
+of re-running the AutoARIMA order search. A full search runs when the last
+one is older than ``FULL_REFIT_EVERY`` or when the previous forecast's error
+on the new bars has drifted past ``DRIFT_THRESHOLD`` times its hold-out MAPE.
+
+Fits never run on the request path: ``get_forecast`` returns the latest
+persisted result immediately and schedules a refresh on a background worker
+when it is stale. Every refreshed forecast is also appended to the live
+forecast store (``.cache/forecasts``) as a new vintage so its accuracy can be
+tracked. Fit times and vintages are in market (Toronto) time.
+"""
+import logging
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.backtest import backtest, error_curves, process_context, rolling_cutoffs, summarize
+from utils.forecast_store import from_statsforecast, live_forecast_store
+from utils.market_data import get_history
+from utils.market_windows import last_final_day, market_now
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = Path(__file__).resolve().parent.parent / '.cache' / 'models'
+FORECAST_HORIZON = 126  # ~6 months of trading days
+HOLDOUT_DAYS = 63  # ~3 months used to score the model
+SEASON_LENGTH = 5  # trading week
+HISTORY_YEARS = 3
+FREQ = 'B'
+LEVELS = [80, 95]  # prediction-interval coverage, in %
+RETRY_AFTER = pd.Timedelta(minutes=10)  # back-off after a failed fit
+FULL_REFIT_EVERY = pd.Timedelta(days=7)
+DRIFT_THRESHOLD = 2.0
+
+
+@dataclass
+class ForecastResult:
+    ticker: str
+    forecast: pd.DataFrame  # columns: ds, AutoARIMA and AutoARIMA-lo/hi-<level>
+    model_string: str
+    mae: float
+    mape: float
+    n_train: int
+    last_bar: pd.Timestamp
+    fitted_at: pd.Timestamp
+    fit_seconds: float
+    model: object = None  # fitted StatsForecast, kept for incremental updates
+    full_fit_at: pd.Timestamp = None  # last full order search
+    update_kind: str = 'full'  # 'full' or 'incremental'
+    drift_mape: float = None  # previous forecast's MAPE on the newly arrived bars
+
+
+def _now():
+    """Naive market-time timestamp, comparable with ``ds`` and stored vintages"""
+    return market_now().tz_localize(None)
+
+
+def interval_columns(model, levels=LEVELS):
+    """Names of the lo/hi interval columns statsforecast produces for ``model``"""
+    prefix = f"{model}-" if model else ""
+    return [f"{prefix}{side}-{level}" for level in levels for side in ('lo', 'hi')]
+
+
+def to_training_frame(history, ticker):
+    """Long ``unique_id, ds, y`` frame expected by statsforecast"""
+    close = history['Close'].dropna()
+    index = close.index
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return pd.DataFrame({'unique_id': ticker, 'ds': index.normalize(), 'y': close.to_numpy()})
+
+
+def error_metrics(y_true, y_pred):
+    """Return (MAE, MAPE in %)"""
+    y_true = np.asarray(y_true, dtype=float)
+    y_pred = np.asarray(y_pred, dtype=float)
+    mae = float(np.mean(np.abs(y_true - y_pred)))
+    mape = float(np.mean(np.abs((y_true - y_pred) / y_true)) * 100)
+    return mae, mape
+
+
+def _fit(train):
+    from statsforecast import StatsForecast
+    from statsforecast.models import AutoARIMA
+
+    sf = StatsForecast(models=[AutoARIMA(season_length=SEASON_LENGTH)], freq=FREQ)
+    sf.fit(df=train)
+    return sf
+
+
+def fit_forecast(history, ticker, horizon=FORECAST_HORIZON, holdout=HOLDOUT_DAYS):
+    """Fit AutoARIMA on ``history`` and forecast ``horizon`` trading days"""
+    from statsforecast.arima import arima_string
+
+    started = time.perf_counter()
+    df = to_training_frame(history, ticker)
+
+    # Score on the hold-out tail, then refit on everything for the live forecast
+    train, test = df.iloc[:-holdout], df.iloc[-holdout:]
+    scored = _fit(train).predict(h=holdout)
+    mae, mape = error_metrics(test['y'], scored['AutoARIMA'].to_numpy()[:len(test)])
+
+    sf = _fit(df)
+    forecast = sf.predict(h=horizon, level=LEVELS).reset_index(drop=True)
+    forecast = forecast[['ds', 'AutoARIMA', *interval_columns('AutoARIMA')]]
+
+    return ForecastResult(
+        ticker=ticker,
+        forecast=forecast,
+        model_string=arima_string(sf.fitted_[0, 0].model_).strip(),
+        mae=mae,
+        mape=mape,
+        n_train=len(df),
+        last_bar=df['ds'].iloc[-1],
+        fitted_at=_now(),
+        fit_seconds=time.perf_counter() - started,
+        model=sf,
+        full_fit_at=_now(),
+    )
+
+
+def forecast_drift(result, df):
+    """MAPE of ``result``'s forecast on bars that arrived after it was fitted"""
+    new_bars = df[df['ds'] > result.last_bar]
+    realized = new_bars.merge(result.forecast, on='ds', how='inner')
+    if realized.empty:
+        return None
+    return error_metrics(realized['y'], realized['AutoARIMA'])[1]
+
+
+def update_forecast(result, history, horizon=FORECAST_HORIZON):
+    """Roll ``result`` forward to the latest bars without a new order search"""
+    started = time.perf_counter()
+    df = to_training_frame(history, result.ticker)
+    model = result.model.fitted_[0, 0]
+    out = model.forward(y=df['y'].to_numpy(), h=horizon, level=LEVELS)
+    last_bar = df['ds'].iloc[-1]
+    forecast = pd.DataFrame({
+        'ds': pd.bdate_range(last_bar + pd.offsets.BDay(), periods=horizon),
+        'AutoARIMA': out['mean'],
+        **{f"AutoARIMA-{key}": out[key] for key in interval_columns('')},
+    })
+    return replace(
+        result,
+        forecast=forecast,
+        n_train=len(df),
+        last_bar=last_bar,
+        fitted_at=_now(),
+        fit_seconds=time.perf_counter() - started,
+        update_kind='incremental',
+    )
+
+
+def refresh_forecast(previous, history, ticker):
+    """Bring a forecast up to date, choosing between a full refit and an update"""
+    if previous is None or previous.model is None:
+        reason = 'no persisted model'
+        drift = None
+    else:
+        df = to_training_frame(history, ticker)
+        drift = forecast_drift(previous, df)
+        full_fit_at = previous.full_fit_at or previous.fitted_at
+        if _now() - full_fit_at >= FULL_REFIT_EVERY:
+            reason = 'scheduled'
+        elif drift is not None and drift > DRIFT_THRESHOLD * max(previous.mape, 1e-9):
+            reason = f'drift {drift:.2f}% > {DRIFT_THRESHOLD}x hold-out {previous.mape:.2f}%'
+        else:
+            result = update_forecast(previous, history)
+            result.drift_mape = drift
+            logger.info("Updated %s incrementally in %.3fs (drift MAPE %s)",
+                        ticker, result.fit_seconds, 'n/a' if drift is None else f'{drift:.2f}%')
+            return result
+
+    result = fit_forecast(history, ticker)
+    result.drift_mape = drift
+    logger.info("Full AutoARIMA refit for %s (%s) in %.1fs: %s",
+                ticker, reason, result.fit_seconds, result.model_string)
+    return result
+
+
+TOURNAMENT_MODELS = ('AutoARIMA', 'AutoETS', 'AutoTheta', 'SeasonalNaive')
+CV_HORIZON = 21  # ~1 month
+CV_WINDOWS = 6  # month-end cutoffs
+
+
+@dataclass
+class TournamentResult:
+    ticker: str
+    leaderboard: pd.DataFrame  # model, mae, mape, folds, fit_seconds, rank
+    forecasts: pd.DataFrame  # ds plus one column per model
+    curves: pd.DataFrame  # per-horizon-step backtest error by model
+    last_bar: pd.Timestamp
+    fitted_at: pd.Timestamp
+    wall_seconds: float
+
+
+def _fit_final(name, df, horizon):
+    """Fit one model on the full history and forecast (runs in a worker process)"""
+    from statsforecast import StatsForecast
+    from statsforecast import models
+
+    started = time.perf_counter()
+    sf = StatsForecast(models=[getattr(models, name)(season_length=SEASON_LENGTH)], freq=FREQ)
+    forecast = sf.fit(df=df).predict(h=horizon).reset_index(drop=True)[['ds', name]]
+    return forecast, time.perf_counter() - started
+
+
+def run_tournament(history, ticker, models=TOURNAMENT_MODELS, horizon=FORECAST_HORIZON,
+                   cv_horizon=CV_HORIZON, cv_windows=CV_WINDOWS, max_workers=None):
+    """Backtest several models on rolling cutoffs, rank them by MAE and forecast with each.
+
+    Backtest folds come from the on-disk fold cache, so a daily rerun only
+    fits the final forecasts. Models run in separate processes, so wall-clock
+    time is close to the slowest single model rather than the sum.
+    """
+    started = time.perf_counter()
+    df = to_training_frame(history, ticker)
+    max_workers = max_workers or min(len(models), os.cpu_count() or 1)
+
+    cutoffs = rolling_cutoffs(df['ds'], cv_horizon, cv_windows)
+    folds = backtest(df, ticker, models, cutoffs, cv_horizon,
+                     season_length=SEASON_LENGTH, max_workers=max_workers)
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=process_context()) as pool:
+        futures = [pool.submit(_fit_final, name, df, horizon) for name in models]
+        outcomes = [f.result() for f in futures]
+
+    fit_seconds = pd.DataFrame({'model': list(models), 'fit_seconds': [o[1] for o in outcomes]})
+    leaderboard = (
+        summarize(folds).merge(fit_seconds, on='model', how='right')
+        .sort_values('mae').reset_index(drop=True)
+    )
+    leaderboard['rank'] = np.arange(1, len(leaderboard) + 1)
+
+    forecasts = outcomes[0][0][['ds']]
+    for forecast, _ in outcomes:
+        forecasts = forecasts.merge(forecast, on='ds', how='outer')
+
+    result = TournamentResult(
+        ticker=ticker,
+        leaderboard=leaderboard,
+        forecasts=forecasts,
+        curves=error_curves(folds),
+        last_bar=df['ds'].iloc[-1],
+        fitted_at=_now(),
+        wall_seconds=time.perf_counter() - started,
+    )
+    logger.info("Tournament for %s (%d models, %d workers) in %.1fs; winner %s",
+                ticker, len(models), max_workers, result.wall_seconds, leaderboard['model'].iloc[0])
+    return result
+
+
+def _result_path(key):
+    return MODEL_DIR / f"{key.replace('^', '_')}.pkl"
+
+
+def save_result(key, result):
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    path = _result_path(key)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'wb') as f:
+        pickle.dump(result, f)
+    tmp.replace(path)
+
+
+def load_result(key):
+    """Last persisted result stored under ``key``, or None"""
+    path = _result_path(key)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception as e:
+        logger.warning("Could not load persisted model %s: %s", key, e)
+        return None
+
+
+class ForecastWorker:
+    """Single background thread that runs model jobs and persists their results.
+
+    Results are stored under a string key (e.g. ``"T.TO"`` for the live
+    AutoARIMA forecast, ``"T.TO.tournament"`` for the model tournament).
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='forecast')
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._results = {}
+        self._failed_at = {}
+        self.last_error = {}
+
+    def latest(self, key):
+        """Most recent result in memory or on disk (never fits)"""
+        with self._lock:
+            result = self._results.get(key)
+        if result is None:
+            result = load_result(key)
+            if result is not None:
+                with self._lock:
+                    self._results.setdefault(key, result)
+        return result
+
+    def is_fitting(self, key):
+        with self._lock:
+            return key in self._pending
+
+    def submit(self, key, job):
+        """Schedule ``job(previous_result)`` unless one is already queued for ``key``"""
+        with self._lock:
+            failed_at = self._failed_at.get(key)
+            if key in self._pending or (failed_at is not None and _now() - failed_at < RETRY_AFTER):
+                return
+            self._pending.add(key)
+        self._executor.submit(self._run, key, job)
+
+    def _run(self, key, job):
+        try:
+            result = job(self.latest(key))
+            save_result(key, result)
+            with self._lock:
+                self._results[key] = result
+                self._failed_at.pop(key, None)
+                self.last_error.pop(key, None)
+        except Exception as e:
+            logger.exception("Model job %s failed", key)
+            with self._lock:
+                self._failed_at[key] = _now()
+                self.last_error[key] = str(e)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = ForecastWorker()
+        return _worker
+
+
+def _latest_bar(history):
+    index = history.index
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index[-1].normalize()
+
+
+def completed_sessions(history):
+    """``history`` without the current session's unfinished bar"""
+    index = history.index
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return history[index.normalize() <= last_final_day()]
+
+
+def _get_or_schedule(key, ticker, years, job):
+    """
+    Return the persisted result for ``key`` and schedule ``job`` if it is stale
+
+    Fits only see completed sessions, so there is one refit per session
+    rather than one on the first intraday bar.
+    """
+    worker = get_worker()
+    result = worker.latest(key)
+    history = completed_sessions(get_history(ticker, years))
+    if history.empty:
+        return result
+    if result is None or result.last_bar < _latest_bar(history):
+        worker.submit(key, lambda previous: job(previous, completed_sessions(get_history(ticker, years))))
+    return result
+
+
+def archive_forecast(result, store=None):
+    """Append a live forecast to the live forecast store as a new vintage"""
+    store = store if store is not None else live_forecast_store()
+    forecasts = result.forecast.assign(unique_id=result.ticker)
+    try:
+        store.write(from_statsforecast(forecasts, ['AutoARIMA'], vintage=result.fitted_at.floor('s')))
+    except Exception:
+        logger.exception("Could not archive the %s forecast", result.ticker)
+    return result
+
+
+def get_forecast(ticker, years=HISTORY_YEARS):
+    """Latest AutoARIMA forecast for ``ticker`` without blocking.
+
+    Returns the persisted result (possibly None) and schedules a background
+    refresh when there is none yet or the price history has newer bars.
+    """
+    return _get_or_schedule(
+        ticker, ticker, years,
+        lambda previous, history: archive_forecast(refresh_forecast(previous, history, ticker)),
+    )
+
+
+def get_tournament(ticker, years=HISTORY_YEARS):
+    """Latest model tournament for ``ticker`` without blocking (see ``get_forecast``)"""
+    return _get_or_schedule(
+        f"{ticker}.tournament", ticker, years,
+        lambda previous, history: run_tournament(history, ticker),
+    )
@@ -0,0 +1,143 @@
+"""Shared market-data service used by every page.
+
+One in-memory copy of each ticker's daily history is kept per process and
+shared across Streamlit sessions. Entries are refreshed from the local price
+store when the session-day token from ``utils.market_windows`` changes, and
+the least recently used tickers are evicted once the memory cap is exceeded.
+
+Frames returned here are shared: callers must treat them as read-only.
+"""
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pandas as pd
+
+from utils.market_windows import normalize_window, price_cache_stats
+from utils.price_store import get_price_store
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+MAX_FETCH_WORKERS = 8
+
+
+@dataclass
+class _Entry:
+    token: str
+    start: pd.Timestamp
+    frame: pd.DataFrame
+    nbytes: int
+
+
+class MarketDataService:
+    """Process-wide LRU cache of per-ticker price history"""
+
+    def __init__(self, store=None, max_bytes=DEFAULT_MAX_BYTES, stats=price_cache_stats):
+        self._store = store
+        self.max_bytes = max_bytes
+        self.stats = stats
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = defaultdict(threading.Lock)
+
+    @property
+    def store(self):
+        return self._store if self._store is not None else get_price_store()
+
+    def get_history(self, ticker, years=2, now=None):
+        """Return ``years`` of daily bars for ``ticker`` ending on the current session"""
+        start, end, token = normalize_window(years, now)
+        self.stats.request(ticker)
+        entry = self._lookup(ticker, start, token)
+        if entry is None:
+            with self._load_locks[ticker]:
+                # Another session may have loaded it while we waited
+                entry = self._lookup(ticker, start, token)
+                if entry is None:
+                    self.stats.miss(ticker)
+                    entry = self._load(ticker, start, end, token)
+        return entry.frame.loc[start:end]
+
+    def get_panel(self, tickers, years=2, field='Close', now=None):
+        """Wide, date-aligned panel of ``field`` for several tickers.
+
+        Histories are loaded concurrently on a bounded thread pool, so a cold
+        panel costs roughly one upstream round-trip rather than one per ticker.
+        Tickers with no data are left out of the panel.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return pd.DataFrame()
+        workers = min(MAX_FETCH_WORKERS, len(tickers))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='market-data') as pool:
+            frames = list(pool.map(lambda t: self.get_history(t, years, now), tickers))
+        columns = {t: f[field] for t, f in zip(tickers, frames) if not f.empty}
+        if not columns:
+            return pd.DataFrame()
+        return pd.DataFrame(columns).sort_index()
+
+    def _lookup(self, ticker, start, token):
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is None or entry.token != token or entry.start > start:
+                return None
+            self._entries.move_to_end(ticker)
+            return entry
+
+    def _load(self, ticker, start, end, token):
+        with self._lock:
+            previous = self._entries.get(ticker)
+        # Keep the longest window any page has asked for
+        if previous is not None:
+            start = min(start, previous.start)
+        frame = self.store.get_history(ticker, start, end)
+        entry = _Entry(token, start, frame, int(frame.memory_usage(deep=True).sum()))
+        if frame.empty:
+            return entry
+        with self._lock:
+            self._entries[ticker] = entry
+            self._entries.move_to_end(ticker)
+            self._evict()
+        return entry
+
+    def _evict(self):
+        total = sum(e.nbytes for e in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            total -= evicted.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def info(self):
+        """Resident tickers (least recently used first) and memory use"""
+        with self._lock:
+            return {
+                'tickers': list(self._entries),
+                'bytes': sum(e.nbytes for e in self._entries.values()),
+                'max_bytes': self.max_bytes,
+            }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_market_data():
+    """Process-wide market-data service"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = MarketDataService()
+        return _service
+
+
+def get_history(ticker, years=2):
+    """Daily bars for ``ticker`` from the shared service"""
+    return get_market_data().get_history(ticker, years)
+
+
+def get_panel(tickers, years=2, field='Close'):
+    """Aligned wide panel of ``field`` for ``tickers`` from the shared service"""
+    return get_market_data().get_panel(tickers, years, field)
@@ -0,0 +1,125 @@
+"""Trading-day aware fetch windows and cache hit/miss counters.
+
+Pages used to pass ``datetime.now()`` straight into cached fetchers, so every
+rerun produced a new cache key. Windows built here are snapped to trading-day
+boundaries and carry a ``token`` that only changes once per session day (or
+once per TTL bucket while the market is open), which makes the cache key
+stable across reruns.
+"""
+import threading
+from collections import defaultdict
+from datetime import time, timedelta
+
+import pandas as pd
+
+MARKET_TZ = 'America/Toronto'
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+INTRADAY_TTL = timedelta(minutes=15)
+
+
+def market_now():
+    """Current wall-clock time on the exchange"""
+    return pd.Timestamp.now(tz=MARKET_TZ)
+
+
+def _as_market_time(now):
+    now = market_now() if now is None else pd.Timestamp(now)
+    if now.tz is None:
+        now = now.tz_localize(MARKET_TZ)
+    return now.tz_convert(MARKET_TZ)
+
+
+def is_trading_day(day):
+    """Weekday check (exchange holidays are not modelled)"""
+    return pd.Timestamp(day).weekday() < 5
+
+
+def previous_trading_day(day):
+    """Latest trading day on or before ``day``"""
+    day = pd.Timestamp(day).normalize()
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def trading_days(start, end):
+    """Trading days in ``[start, end]`` (weekdays; exchange holidays are not modelled)"""
+    return pd.bdate_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize())
+
+
+def last_final_day(now=None):
+    """Most recent day whose bar can no longer change (yesterday, market time; tz-naive)"""
+    return _as_market_time(now).tz_localize(None).normalize() - timedelta(days=1)
+
+
+def market_is_open(now=None):
+    """True during regular trading hours"""
+    now = _as_market_time(now)
+    return is_trading_day(now) and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+def session_day(now=None):
+    """Trading day whose data a fetch at ``now`` should end on (tz-naive)"""
+    now = _as_market_time(now)
+    today = now.tz_localize(None).normalize()
+    if is_trading_day(today) and now.time() >= MARKET_OPEN:
+        return today
+    return previous_trading_day(today - timedelta(days=1))
+
+
+def cache_token(now=None, ttl=INTRADAY_TTL):
+    """Cache-key component: the session day, plus a TTL bucket while the market is open"""
+    now = _as_market_time(now)
+    day = session_day(now)
+    if not market_is_open(now):
+        return day.strftime('%Y-%m-%d')
+    opened = now.normalize() + timedelta(hours=MARKET_OPEN.hour, minutes=MARKET_OPEN.minute)
+    bucket = int((now - opened) / ttl)
+    return f"{day:%Y-%m-%d}#{bucket}"
+
+
+def normalize_window(years=2, now=None):
+    """Return ``(start, end, token)`` for ``years`` of history ending on the current session"""
+    end = session_day(now)
+    start = previous_trading_day(end - timedelta(days=int(years * 365)))
+    return start, end, cache_token(now)
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters for a cached fetcher.
+
+    Call ``request`` on every lookup and ``miss`` from inside the cached body;
+    hits are the difference.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = defaultdict(int)
+        self._misses = defaultdict(int)
+
+    def request(self, key):
+        with self._lock:
+            self._requests[key] += 1
+
+    def miss(self, key):
+        with self._lock:
+            self._misses[key] += 1
+
+    def snapshot(self):
+        """Return ``{key: {'hits', 'misses'}}``"""
+        with self._lock:
+            return {
+                key: {'hits': count - self._misses[key], 'misses': self._misses[key]}
+                for key, count in self._requests.items()
+            }
+
+    def summary(self):
+        """One-line total for display"""
+        stats = self.snapshot().values()
+        hits = sum(s['hits'] for s in stats)
+        misses = sum(s['misses'] for s in stats)
+        return f"{hits} hits / {misses} misses"
+
+
+price_cache_stats = CacheStats()
@@ -0,0 +1,66 @@
+"""Declarative registry of the portfolio's pages.
+
+Each ``PageSpec`` names its navigation label, the module and function that
+render it, the background data sources it reads (refresh jobs from
+``utils.prefetch``) and the jobs to warm while it is open — the data a
+visitor is likely to need next. The router in ``app.py`` builds navigation
+from ``PAGES``, imports only the selected page's module and starts its
+prefetch jobs; adding a page means adding one entry here.
+"""
+import importlib
+from dataclasses import dataclass
+
+from utils.prefetch import register_prefetch_jobs
+
+
+@dataclass(frozen=True)
+class PageSpec:
+    label: str
+    module: str
+    entry: str = 'show'
+    data_sources: tuple = ()  # refresh jobs whose snapshots the page reads
+    prefetch: tuple = None  # jobs to warm while open; None = the next page's data sources
+
+    def load(self):
+        """Import the page module (once per process) and return its entry function"""
+        return getattr(importlib.import_module(self.module), self.entry)
+
+
+PAGES = [
+    # Visitors land here first, so warm every market-data page behind it
+    PageSpec("🏠 Resume & Portfolio", "pages.resume_page",
+             prefetch=("esg_event_study", "telus_forecasts")),
+    PageSpec("📈 ESG Dashboard", "pages.esg_dashboard"),
+    PageSpec("🎯 ESG-Stock Correlation Analysis", "pages.esg_stock_project",
+             data_sources=("esg_event_study",)),
+    PageSpec("🔮 Stock Forecasting Models", "pages.stock_forecasting",
+             data_sources=("telus_forecasts",)),
+]
+
+
+def labels():
+    return [page.label for page in PAGES]
+
+
+def get_page(label):
+    """Spec for a navigation label; KeyError if it is not registered"""
+    for page in PAGES:
+        if page.label == label:
+            return page
+    raise KeyError(label)
+
+
+def likely_next(page):
+    """The page after ``page`` in navigation order"""
+    return PAGES[(PAGES.index(page) + 1) % len(PAGES)]
+
+
+def prefetch_jobs(page):
+    """Refresh jobs to schedule while ``page`` is shown"""
+    warm = page.prefetch if page.prefetch is not None else likely_next(page).data_sources
+    return list(dict.fromkeys(page.data_sources + tuple(warm)))
+
+
+def start_prefetch(page):
+    """Schedule ``page``'s data sources and its prefetch jobs in the background"""
+    register_prefetch_jobs(prefetch_jobs(page))
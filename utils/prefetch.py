@@ -0,0 +1,69 @@
+"""Background refresh jobs behind the market-data pages.
+
+Kept apart from the page modules so the page registry can schedule them
+without importing Plotly or the page code; each job imports the analytics
+it needs when it first runs on the refresh thread.
+"""
+import threading
+
+from utils.esg_events import (
+    BENCHMARK, DEFAULT_ESTIMATION_DAYS, DEFAULT_EVENT_HALF_WIDTH, ESG_EVENTS, PEER_TICKERS, study_windows,
+)
+from utils.refresh_scheduler import register_refresh
+
+
+def refresh_event_study():
+    """Background job: prices, peers and the default-settings event study"""
+    from utils.event_study import batch_event_impact, market_model_event_study
+    from utils.market_data import get_history, get_panel
+
+    telus_data = get_history("T.TO", years=2)  # 2 years of data
+    benchmark_data = get_history(BENCHMARK, years=2)
+    peer_panel = get_panel(["T.TO"] + PEER_TICKERS, years=2)
+    event_dates = [e['date'] for e in ESG_EVENTS]
+    impacts = batch_event_impact(telus_data, event_dates) if not telus_data.empty else None
+    study = None
+    if not telus_data.empty and not benchmark_data.empty:
+        estimation_window, event_window = study_windows(DEFAULT_ESTIMATION_DAYS, DEFAULT_EVENT_HALF_WIDTH)
+        study = market_model_event_study(
+            telus_data['Close'], benchmark_data['Close'], event_dates,
+            estimation_window=estimation_window, event_window=event_window,
+        )
+    return {
+        'telus': telus_data, 'benchmark': benchmark_data, 'peers': peer_panel,
+        'impacts': impacts, 'study': study,
+    }
+
+
+def refresh_forecasts():
+    """Background job: Telus prices, forecast/tournament scheduling and accuracy scoring"""
+    from utils.forecast_accuracy import get_accuracy_tracker
+    from utils.forecasting import get_forecast, get_tournament
+    from utils.market_data import get_history
+
+    hist = get_history("T.TO", years=2)  # 2 years of data
+    if not hist.empty:
+        # Both return immediately and queue stale fits on the forecast worker
+        get_forecast("T.TO")
+        get_tournament("T.TO")
+        get_accuracy_tracker().update("T.TO", hist['Close'])
+    return hist
+
+
+JOBS = {
+    "esg_event_study": refresh_event_study,
+    "telus_forecasts": refresh_forecasts,
+}
+
+_registered = set()
+_registered_lock = threading.Lock()
+
+
+def register_prefetch_jobs(names=None):
+    """Schedule the named jobs (default: all) on the refresh scheduler, once each"""
+    names = list(JOBS) if names is None else names
+    with _registered_lock:
+        for name in names:
+            if name not in _registered:
+                register_refresh(name, JOBS[name])
+                _registered.add(name)
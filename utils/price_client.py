@@ -0,0 +1,174 @@
+"""Resilient front end for an upstream price provider.
+
+``PriceClient`` wraps any provider with a ``fetch(ticker, start, end)``
+method (``YFinanceProvider``, ``FrameProvider`` or a test fake) and is itself
+such a provider, so ``PriceStore`` uses it transparently. It adds:
+
+- single-flight: concurrent identical requests share one upstream call;
+- a token-bucket rate limit on upstream calls;
+- retries with exponential backoff and jitter (tenacity), for transient
+  errors only: the provider's ``transient_errors`` or ``TRANSIENT_ERRORS``;
+- latency and error metrics (``ClientMetrics``).
+"""
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE = 2.0  # upstream calls per second
+DEFAULT_BURST = 5
+DEFAULT_ATTEMPTS = 3
+LATENCY_WINDOW = 500  # upstream calls kept for latency percentiles
+TRANSIENT_ERRORS = (OSError,)  # connection resets, timeouts, DNS failures
+
+
+class TokenBucket:
+    """Blocking token bucket: ``rate`` tokens per second, at most ``capacity`` saved"""
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=DEFAULT_BURST, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Take one token, sleeping until one is available; returns seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+class ClientMetrics:
+    """Thread-safe counters and recent upstream latencies"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.requests = 0  # fetch() calls
+        self.coalesced = 0  # calls that joined an in-flight fetch
+        self.upstream = 0  # attempts sent to the provider
+        self.retries = 0
+        self.errors = 0  # requests that failed after every attempt
+        self.throttled_seconds = 0.0
+        self.last_error = None
+
+    def record(self, field, amount=1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def record_error(self, error):
+        with self._lock:
+            self.errors += 1
+            self.last_error = str(error)
+
+    def snapshot(self):
+        with self._lock:
+            latencies = np.array(self._latencies)
+            return {
+                'requests': self.requests,
+                'coalesced': self.coalesced,
+                'upstream': self.upstream,
+                'retries': self.retries,
+                'errors': self.errors,
+                'throttled_seconds': round(self.throttled_seconds, 3),
+                'latency_p50': float(np.percentile(latencies, 50)) if len(latencies) else None,
+                'latency_p95': float(np.percentile(latencies, 95)) if len(latencies) else None,
+                'last_error': self.last_error,
+            }
+
+    def summary(self):
+        stats = self.snapshot()
+        latency = f"p50 {stats['latency_p50']:.2f}s" if stats['latency_p50'] is not None else "no calls"
+        return (f"{stats['upstream']} upstream calls ({latency}), {stats['coalesced']} coalesced, "
+                f"{stats['retries']} retries, {stats['errors']} errors")
+
+
+class PriceClient:
+    """Single-flight, rate-limited, retrying wrapper around a price provider"""
+
+    def __init__(self, provider, rate=DEFAULT_RATE, burst=DEFAULT_BURST, attempts=DEFAULT_ATTEMPTS,
+                 wait=None, bucket=None, metrics=None, retry_on=None):
+        self.provider = provider
+        self.attempts = attempts
+        self.retry_on = retry_on  # None: the provider's transient_errors, else TRANSIENT_ERRORS
+        self.wait = wait if wait is not None else wait_exponential_jitter(initial=0.5, max=8)
+        self.bucket = bucket if bucket is not None else TokenBucket(rate, burst)
+        self.metrics = metrics if metrics is not None else ClientMetrics()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, ticker, start, end):
+        """Provider ``fetch`` shared by every concurrent caller with the same arguments"""
+        key = (ticker, start, end)
+        self.metrics.record('requests')
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self.metrics.record('coalesced')
+            return future.result()
+
+        try:
+            future.set_result(self._fetch_with_retry(ticker, start, end))
+        except Exception as e:
+            self.metrics.record_error(e)
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return future.result()
+
+    def _fetch_with_retry(self, ticker, start, end):
+        retry_on = self.retry_on
+        if retry_on is None:
+            retry_on = getattr(self.provider, 'transient_errors', TRANSIENT_ERRORS)
+        retrying = Retrying(
+            retry=retry_if_exception_type(retry_on),
+            stop=stop_after_attempt(self.attempts),
+            wait=self.wait,
+            before_sleep=lambda state: logger.warning(
+                "Price fetch for %s failed (attempt %d), retrying in %.1fs: %s",
+                ticker, state.attempt_number, state.next_action.sleep, state.outcome.exception()),
+            reraise=True,
+        )
+        for attempt in retrying:
+            with attempt:
+                if attempt.retry_state.attempt_number > 1:
+                    self.metrics.record('retries')
+                return self._call(ticker, start, end)
+
+    def _call(self, ticker, start, end):
+        self.metrics.record('throttled_seconds', self.bucket.acquire())
+        self.metrics.record('upstream')
+        started = time.perf_counter()
+        try:
+            return self.provider.fetch(ticker, start, end)
+        finally:
+            self.metrics.record_latency(time.perf_counter() - started)
@@ -0,0 +1,293 @@
+"""Local OHLCV price store backed by SQLite.
+
+Daily bars are kept on disk keyed by (ticker, date). A request only goes to
+the upstream provider for the part of the window that has never been fetched,
+so a restarted app serves previously seen history without touching the network
+and keeps working from disk when the provider is slow or down. The default
+Yahoo Finance provider is wrapped in a ``PriceClient`` (single-flight, rate
+limit, retries, metrics).
+
+Yahoo prices are dividend- and split-adjusted as of the fetch, so bars fetched
+before a corporate action are on a different basis than bars fetched after
+it. When newly fetched bars carry a dividend or split (the provider's
+``Dividends`` / ``Stock Splits`` columns), the ticker's stored history is
+dropped and refetched on the new basis.
+"""
+import logging
+import sqlite3
+import threading
+from datetime import timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from utils.market_windows import last_final_day, trading_days
+from utils.price_client import PriceClient
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+ACTION_COLUMNS = ['Dividends', 'Stock Splits']
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / '.cache' / 'prices.sqlite'
+MARKET_TZ = 'America/Toronto'
+SETTLEMENT_WINDOW = timedelta(days=3)  # after this an empty window is taken as final
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (ticker, date)
+);
+CREATE TABLE IF NOT EXISTS coverage (
+    ticker TEXT PRIMARY KEY,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL
+);
+"""
+
+
+def _to_day(value):
+    """Normalise a date-like value to a tz-naive midnight Timestamp"""
+    ts = pd.Timestamp(value)
+    if ts.tz is not None:
+        ts = ts.tz_convert(MARKET_TZ).tz_localize(None)
+    return ts.normalize()
+
+
+def settled_empty(start, end):
+    """
+    Whether an empty answer for ``[start, end]`` can be trusted as final
+
+    True when the window has no trading sessions, or when it ended more than
+    ``SETTLEMENT_WINDOW`` before the last final day (an exchange holiday, a
+    listing gap). A recent window with sessions but no bars is more likely a
+    throttled or late upstream answer and should be asked again.
+    """
+    return len(trading_days(start, end)) == 0 or end < last_final_day() - SETTLEMENT_WINDOW
+
+
+def corporate_action_dates(frame):
+    """Dates of the dividends and splits reported alongside fetched bars"""
+    if frame is None or frame.empty:
+        return pd.DatetimeIndex([])
+    columns = [c for c in ACTION_COLUMNS if c in frame.columns]
+    if not columns:
+        return pd.DatetimeIndex([])
+    actions = frame[columns].fillna(0).ne(0).any(axis=1)
+    return pd.DatetimeIndex(frame.index[actions.to_numpy()])
+
+
+class YFinanceProvider:
+    """Upstream provider backed by Yahoo Finance"""
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+
+    @property
+    def transient_errors(self):
+        """Errors worth retrying: transport failures and Yahoo rate limiting"""
+        from yfinance.exceptions import YFRateLimitError
+        return (OSError, YFRateLimitError)
+
+    def fetch(self, ticker, start, end):
+        """Return daily OHLCV bars for ``start <= date <= end``"""
+        import yfinance as yf
+        from yfinance.exceptions import YFPricesMissingError
+        # yfinance treats ``end`` as exclusive; raise so failures can be retried
+        try:
+            # Adjusted prices; actions=True reports dividends and splits so the
+            # store can tell when earlier bars change basis
+            return yf.Ticker(ticker).history(
+                start=start, end=end + timedelta(days=1), timeout=self.timeout, raise_errors=True,
+                auto_adjust=True, actions=True,
+            )
+        except YFPricesMissingError:
+            # Yahoo also raises this for throttled or late data, so it only means
+            # "no bars" for a window without sessions or one that has settled
+            if settled_empty(_to_day(start), _to_day(end)):
+                return pd.DataFrame(columns=OHLCV_COLUMNS)
+            raise
+
+
+class FrameProvider:
+    """Offline provider serving bars from in-memory DataFrames.
+
+    Useful for running the app or scripts without network access; ``calls``
+    records every upstream request so callers can check what was fetched.
+    """
+
+    def __init__(self, frames):
+        self.frames = {ticker: frame.sort_index() for ticker, frame in frames.items()}
+        self.calls = []
+
+    @classmethod
+    def from_csv(cls, path):
+        """Build a provider from a long CSV with ``ticker``, ``Date`` and OHLCV columns"""
+        df = pd.read_csv(path, parse_dates=['Date'])
+        return cls({
+            ticker: group.drop(columns='ticker').set_index('Date')
+            for ticker, group in df.groupby('ticker')
+        })
+
+    def fetch(self, ticker, start, end):
+        self.calls.append((ticker, start, end))
+        frame = self.frames.get(ticker)
+        if frame is None:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        index = frame.index
+        if index.tz is not None:
+            index = index.tz_convert(MARKET_TZ).tz_localize(None)
+        days = index.normalize()
+        return frame[(days >= start) & (days <= end)]
+
+
+class PriceStore:
+    """SQLite-backed OHLCV store that fills gaps from an upstream provider"""
+
+    def __init__(self, path=DEFAULT_DB_PATH, provider=None):
+        self.path = Path(path)
+        self.provider = provider if provider is not None else PriceClient(YFinanceProvider())
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def coverage(self, ticker):
+        """Return the (start, end) span already fetched for ``ticker``, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT start, end FROM coverage WHERE ticker = ?", (ticker,)
+            ).fetchone()
+        if row is None:
+            return None
+        return pd.Timestamp(row[0]), pd.Timestamp(row[1])
+
+    def missing_ranges(self, ticker, start, end):
+        """Date ranges inside ``[start, end]`` that have not been fetched yet"""
+        start, end = _to_day(start), _to_day(end)
+        covered = self.coverage(ticker)
+        if covered is None:
+            return [(start, end)]
+        cov_start, cov_end = covered
+        ranges = []
+        # Ranges are widened up to the covered span so coverage stays contiguous
+        if start < cov_start:
+            ranges.append((start, cov_start - timedelta(days=1)))
+        if end > cov_end:
+            ranges.append((cov_end + timedelta(days=1), end))
+        return ranges
+
+    def get_history(self, ticker, start, end):
+        """Return stored bars for ``[start, end]``, fetching only what is missing.
+
+        Provider errors are logged and the stored bars are returned as-is.
+        """
+        start, end = _to_day(start), _to_day(end)
+        for gap_start, gap_end in self.missing_ranges(ticker, start, end):
+            try:
+                fetched = self.provider.fetch(ticker, gap_start, gap_end)
+            except Exception as e:
+                logger.warning("Price fetch for %s %s..%s failed: %s",
+                               ticker, gap_start.date(), gap_end.date(), e)
+                continue
+            # Only actions newer than every stored bar change the stored bars' basis
+            # (today's re-fetched bar would otherwise trigger a reset on every call)
+            last_stored = self._last_stored_day(ticker)
+            actions = corporate_action_dates(fetched)
+            actions = actions[actions.map(_to_day) > last_stored] if last_stored is not None else actions[:0]
+            if len(actions):
+                # Stored bars before the action are on the old adjustment basis
+                logger.info("Corporate action for %s on %s; refetching its history",
+                            ticker, ', '.join(f"{d:%Y-%m-%d}" for d in actions))
+                self.reset(ticker)
+                return self.get_history(ticker, start, end)
+            self._append(ticker, fetched, gap_start, gap_end)
+        return self.read(ticker, start, end)
+
+    def _last_stored_day(self, ticker):
+        with self._connect() as conn:
+            row = conn.execute("SELECT MAX(date) FROM bars WHERE ticker = ?", (ticker,)).fetchone()
+        return pd.Timestamp(row[0]) if row[0] is not None else None
+
+    def reset(self, ticker):
+        """Forget every stored bar and the covered span of ``ticker``"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM bars WHERE ticker = ?", (ticker,))
+            conn.execute("DELETE FROM coverage WHERE ticker = ?", (ticker,))
+
+    def read(self, ticker, start, end):
+        """Read stored bars for ``[start, end]`` without touching the provider"""
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                "SELECT date, open, high, low, close, volume FROM bars "
+                "WHERE ticker = ? AND date BETWEEN ? AND ? ORDER BY date",
+                conn,
+                params=(ticker, _to_day(start).strftime('%Y-%m-%d'), _to_day(end).strftime('%Y-%m-%d')),
+            )
+        df['date'] = pd.to_datetime(df['date'])
+        df = df.set_index('date')
+        df.index.name = 'Date'
+        df.columns = OHLCV_COLUMNS
+        return df
+
+    def _append(self, ticker, frame, start, end):
+        """Upsert fetched bars and extend the covered span"""
+        rows = []
+        if frame is not None and not frame.empty:
+            frame = frame[OHLCV_COLUMNS].dropna(subset=['Close'])
+            for ts, bar in zip(frame.index, frame.itertuples(index=False)):
+                rows.append((ticker, _to_day(ts).strftime('%Y-%m-%d'), *map(float, bar)))
+
+        # Today's bar can still change, so it is stored but not marked covered.
+        # An empty answer only counts as covered once it is settled; otherwise
+        # coverage is left alone and the next call asks again.
+        end = min(end, last_final_day())
+        if not rows and not settled_empty(start, end):
+            end = start - timedelta(days=1)
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            if start > end:
+                return
+            row = conn.execute(
+                "SELECT start, end FROM coverage WHERE ticker = ?", (ticker,)
+            ).fetchone()
+            if row is not None:
+                start = min(start, pd.Timestamp(row[0]))
+                end = max(end, pd.Timestamp(row[1]))
+            conn.execute(
+                "INSERT OR REPLACE INTO coverage VALUES (?, ?, ?)",
+                (ticker, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')),
+            )
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_price_store():
+    """Process-wide store shared by every page"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = PriceStore()
+        return _default_store
+
+
+def upstream_summary():
+    """Metrics line of the shared store's ``PriceClient``, or None if it has none"""
+    metrics = getattr(get_price_store().provider, 'metrics', None)
+    return metrics.summary() if metrics is not None else None
+
+
+def set_price_store(store):
+    """Swap the shared store, e.g. for one backed by a ``FrameProvider``"""
+    global _default_store
+    with _default_store_lock:
+        _default_store = store
+
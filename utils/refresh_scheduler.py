@@ -0,0 +1,150 @@
+"""Background refresh of everything a page needs before anyone asks for it.
+
+One daemon thread per process runs the registered refresh jobs — price
+downloads, event studies, forecast scheduling — and keeps the latest result
+of each as a ``Snapshot``. Pages read snapshots instead of calling upstream
+services, so a script run never waits on the network or on a model fit; the
+only wait is for a job's very first snapshot after a cold start.
+
+Jobs are re-run every ``OPEN_INTERVAL`` while the market is open and every
+``CLOSED_INTERVAL`` otherwise. A failing job keeps its previous snapshot.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+
+from utils.market_windows import INTRADAY_TTL, market_is_open, market_now
+
+logger = logging.getLogger(__name__)
+
+OPEN_INTERVAL = pd.Timedelta(INTRADAY_TTL)
+CLOSED_INTERVAL = pd.Timedelta(hours=1)
+FIRST_SNAPSHOT_TIMEOUT = 60  # seconds a cold page waits for a job's first run
+
+
+@dataclass
+class Snapshot:
+    value: object
+    refreshed_at: pd.Timestamp  # market time
+    seconds: float
+
+    def describe(self, now=None):
+        """Freshness line for page captions"""
+        now = now if now is not None else market_now()
+        minutes = int((now - self.refreshed_at).total_seconds() // 60)
+        age = "just now" if minutes < 1 else f"{minutes} min ago"
+        return f"Data refreshed {self.refreshed_at:%Y-%m-%d %H:%M} ET ({age})"
+
+
+class RefreshScheduler:
+    """Runs named refresh jobs on a background thread and keeps their snapshots"""
+
+    def __init__(self, open_interval=OPEN_INTERVAL, closed_interval=CLOSED_INTERVAL):
+        self.open_interval = open_interval
+        self.closed_interval = closed_interval
+        self._jobs = {}
+        self._snapshots = {}
+        self._attempted_at = {}
+        self.last_error = {}
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, name, job):
+        """Add (or replace) the job producing snapshot ``name``; it runs promptly"""
+        with self._cond:
+            self._jobs[name] = job
+            self._attempted_at.pop(name, None)
+        self._wake.set()
+
+    def start(self):
+        """Start the refresh thread unless it is already running"""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='refresh-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def snapshot(self, name):
+        """Latest snapshot for ``name`` or None (never runs the job)"""
+        with self._cond:
+            return self._snapshots.get(name)
+
+    def wait_for(self, name, timeout=FIRST_SNAPSHOT_TIMEOUT):
+        """Latest snapshot, waiting up to ``timeout`` seconds if there is none yet"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while name not in self._snapshots:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or name in self.last_error:
+                    return None
+                self._cond.wait(remaining)
+            return self._snapshots[name]
+
+    def interval(self, now=None):
+        return self.open_interval if market_is_open(now) else self.closed_interval
+
+    def run_due(self, now=None):
+        """Run every job that has never run or is older than the interval"""
+        now = now if now is not None else market_now()
+        with self._cond:
+            due = [
+                (name, job) for name, job in self._jobs.items()
+                if name not in self._attempted_at or now - self._attempted_at[name] >= self.interval(now)
+            ]
+        for name, job in due:
+            self._run(name, job)
+        return [name for name, _ in due]
+
+    def _run(self, name, job):
+        started = time.perf_counter()
+        with self._cond:
+            self._attempted_at[name] = market_now()
+        try:
+            value = job()
+        except Exception as e:
+            logger.exception("Refresh job %s failed", name)
+            with self._cond:
+                self.last_error[name] = str(e)
+                self._cond.notify_all()
+            return
+        snapshot = Snapshot(value, market_now(), time.perf_counter() - started)
+        with self._cond:
+            self._snapshots[name] = snapshot
+            self.last_error.pop(name, None)
+            self._cond.notify_all()
+        logger.info("Refreshed %s in %.1fs", name, snapshot.seconds)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            self.run_due()
+            self._wake.wait(timeout=60)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide scheduler, started on first use"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RefreshScheduler()
+            _scheduler.start()
+        return _scheduler
+
+
+def register_refresh(name, job):
+    """Shortcut for ``get_scheduler().register``"""
+    get_scheduler().register(name, job)